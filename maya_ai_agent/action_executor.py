@@ -19,6 +19,15 @@ from .qt_compat import Signal, QObject
 from .tool_registry import registry
 
 
+def _invalidate_vision_cache():
+    """Tell vision_tool its cached scene metadata may be stale."""
+    try:
+        from .tools.vision_tool import invalidate_scene_metadata
+    except Exception:
+        return
+    invalidate_scene_metadata()
+
+
 class ActionExecutor(QObject):
     """
     Executes tool calls safely on the Maya main thread.
@@ -106,6 +115,8 @@ class ActionExecutor(QObject):
             }
         finally:
             cmds.undoInfo(closeChunk=True)
+            if func_name != "capture_viewport":
+                _invalidate_vision_cache()
 
         self.execution_finished.emit(
             call_id, func_name, json.dumps(result, ensure_ascii=False)
@@ -720,7 +720,8 @@ class ChatWidget(QtWidgets.QWidget):
         self._set_busy(True)
         self._worker = LLMWorker(
             messages, tools=tools, tool_choice=tool_choice,
-            stream=use_stream, parent=self
+            stream=use_stream, parent=self,
+            tools_json=registry.get_all_schemas_json() if tools else None,
         )
         self._worker.response_chunk.connect(self._on_response_chunk)
         self._worker.response_finished.connect(self._on_response)
@@ -39,6 +39,20 @@ _RETRY_BACKOFF_BASE = 1.5  # seconds — will be multiplied by 2^attempt
 _RETRYABLE_HTTP_CODES = {429, 500, 502, 503}
 
 
+def _encode_payload(payload, tools_json=None):
+    """
+    Serialise a request payload to UTF-8 JSON bytes.
+
+    If tools_json (the registry's pre-serialised schema array) is given, it
+    is spliced in as "tools" instead of re-encoding the schema dicts.
+    """
+    if tools_json is None or "tools" not in payload:
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    rest = {k: v for k, v in payload.items() if k != "tools"}
+    body = json.dumps(rest, ensure_ascii=False)
+    return (body[:-1] + ', "tools": ' + tools_json + "}").encode("utf-8")
+
+
 class LLMWorker(QThread):
     """
     Background thread that sends messages to the LLM API
@@ -56,7 +70,7 @@ class LLMWorker(QThread):
     usage_received = Signal(str)       # JSON string of token usage info
 
     def __init__(self, messages, tools=None, tool_choice="auto",
-                 stream=True, parent=None):
+                 stream=True, parent=None, tools_json=None):
         """
         Args:
             messages: List of message dicts [{"role": "...", "content": "..."}]
@@ -64,10 +78,13 @@ class LLMWorker(QThread):
             tool_choice: "auto" (LLM decides), "none" (force text-only), or a
                          specific tool dict.
             stream: Whether to use streaming (SSE). Default True.
+            tools_json: Optional pre-serialised JSON array of `tools`, sent
+                        as-is instead of re-encoding the schemas.
         """
         super().__init__(parent)
         self.messages = messages
         self.tools = tools
+        self.tools_json = tools_json
         self.tool_choice = tool_choice
         self.stream = stream
         self._is_cancelled = False
@@ -118,7 +135,7 @@ class LLMWorker(QThread):
         }
 
         try:
-            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            data = _encode_payload(payload, self.tools_json)
 
             last_error = None
             for attempt in range(_MAX_RETRIES):
@@ -145,7 +162,7 @@ class LLMWorker(QThread):
                         except Exception:
                             pass
                         del payload["stream_options"]
-                        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                        data = _encode_payload(payload, self.tools_json)
                         continue
 
                     if e.code in _RETRYABLE_HTTP_CODES and attempt < _MAX_RETRIES - 1:
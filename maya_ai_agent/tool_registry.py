@@ -9,6 +9,8 @@ Each tool is registered with:
 Tools are discovered and registered at import time.
 """
 
+import json
+
 
 class ToolRegistry:
     """Singleton registry that holds all available tools."""
@@ -19,6 +21,7 @@ class ToolRegistry:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._tools = {}
+            cls._instance._schemas_json = None
         return cls._instance
 
     def register(self, name, func, schema):
@@ -30,10 +33,14 @@ class ToolRegistry:
             func (callable): Python function to execute.
             schema (dict): OpenAI-compatible tool schema.
         """
+        # Schemas never change after registration, so serialise them once
+        # here instead of on every LLM request.
         self._tools[name] = {
             "func": func,
             "schema": schema,
+            "schema_json": json.dumps(schema, ensure_ascii=False),
         }
+        self._schemas_json = None
 
     def get_func(self, name):
         """Get the callable for a registered tool."""
@@ -44,6 +51,13 @@ class ToolRegistry:
         """Get list of all tool schemas for the LLM API request."""
         return [entry["schema"] for entry in self._tools.values()]
 
+    def get_all_schemas_json(self):
+        """Get the JSON array of all tool schemas, serialised once and cached."""
+        if self._schemas_json is None:
+            self._schemas_json = "[{}]".format(", ".join(
+                entry["schema_json"] for entry in self._tools.values()))
+        return self._schemas_json
+
     def get_all_names(self):
         """Get list of all registered tool names."""
         return list(self._tools.keys())
@@ -55,6 +69,7 @@ class ToolRegistry:
     def clear(self):
         """Clear all registered tools (for testing)."""
         self._tools.clear()
+        self._schemas_json = None
 
 
 # Module-level convenience accessor
@@ -6,12 +6,36 @@ Includes:
     - Euler Filter (gimbal lock fix)
     - Mirror Controller Pose
     - Smooth animation curves
+
+Per-object results are returned as lists under "data"; "message" is a
+one-line summary.
 """
 
+from functools import lru_cache
+
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaAnim as oma
 import maya.cmds as cmds
-import maya.mel as mel
+
+try:
+    import numpy as np
+except ImportError:  # numpy is not bundled with every Maya version
+    np = None
 
 from ..tool_registry import tool
+from .maya_tools import _fast_scene
+
+
+# Mirror naming patterns: (source_pattern, target_pattern), in priority order
+_MIRROR_PATTERNS = (
+    ("L_", "R_"), ("R_", "L_"),
+    ("_L_", "_R_"), ("_R_", "_L_"),
+    ("_L", "_R"), ("_R", "_L"),
+    ("Left", "Right"), ("Right", "Left"),
+    ("left", "right"), ("right", "left"),
+    ("_l_", "_r_"), ("_r_", "_l_"),
+    ("l_", "r_"), ("r_", "l_"),
+)
 
 
 # ---------------------------------------------------------------------------
@@ -46,6 +70,7 @@ def euler_filter(objects=None):
 
     filtered = []
     skipped = []
+    curves_by_obj = []
     for obj in objects:
         if not cmds.objExists(obj):
             skipped.append("{}: 不存在".format(obj))
@@ -53,40 +78,36 @@ def euler_filter(objects=None):
 
         short = obj.rsplit("|", 1)[-1]
         # Find rotation animation curves
-        rot_attrs = ["rotateX", "rotateY", "rotateZ"]
-        anim_curves = []
-        for attr in rot_attrs:
-            full_attr = "{}.{}".format(obj, attr)
-            curves = cmds.listConnections(full_attr, type="animCurve") or []
-            anim_curves.extend(curves)
+        rot_plugs = ["{}.{}".format(obj, attr)
+                     for attr in ("rotateX", "rotateY", "rotateZ")]
+        anim_curves = cmds.listConnections(rot_plugs, type="animCurve") or []
 
         if not anim_curves:
             skipped.append("{}: 无旋转动画曲线".format(short))
             continue
-
-        # Select the curves and run euler filter
-        cmds.select(anim_curves, replace=True)
-        try:
-            mel.eval("filterCurve")
-            filtered.append(short)
-        except Exception as e:
-            skipped.append("{}: 错误 - {}".format(short, str(e)))
-
-    # Restore selection
-    if objects:
-        existing = [o for o in objects if cmds.objExists(o)]
-        if existing:
-            cmds.select(existing, replace=True)
-
-    parts = []
-    if filtered:
-        parts.append("已滤波: {}".format(", ".join(filtered)))
-    if skipped:
-        parts.append("跳过: {}".format("; ".join(skipped)))
+        curves_by_obj.append((short, anim_curves))
+
+    # Filter every collected curve in one call; no selection changes needed
+    if curves_by_obj:
+        with _fast_scene():
+            try:
+                cmds.filterCurve(
+                    [c for _, curves in curves_by_obj for c in curves])
+                filtered.extend(short for short, _ in curves_by_obj)
+            except Exception:
+                # Retry per object to isolate the failing one
+                for short, curves in curves_by_obj:
+                    try:
+                        cmds.filterCurve(curves)
+                        filtered.append(short)
+                    except Exception as e:
+                        skipped.append("{}: 错误 - {}".format(short, str(e)))
 
     return {
         "success": len(filtered) > 0,
-        "message": "欧拉角滤波完成。\n" + "\n".join(parts) if parts else "无操作。",
+        "message": "欧拉角滤波完成: 已滤波 {} 个物体，跳过 {} 个。".format(
+            len(filtered), len(skipped)),
+        "data": {"filtered": filtered, "skipped": skipped},
     }
 
 
@@ -125,17 +146,6 @@ def mirror_controller_pose(objects=None, mirror_axis="x"):
     if not objects:
         return {"success": False, "message": "没有指定物体，也没有选中任何物体。"}
 
-    # Mirror naming patterns: (source_pattern, target_pattern)
-    mirror_patterns = [
-        ("L_", "R_"), ("R_", "L_"),
-        ("_L_", "_R_"), ("_R_", "_L_"),
-        ("_L", "_R"), ("_R", "_L"),
-        ("Left", "Right"), ("Right", "Left"),
-        ("left", "right"), ("right", "left"),
-        ("_l_", "_r_"), ("_r_", "_l_"),
-        ("l_", "r_"), ("r_", "l_"),
-    ]
-
     # Axis flip mapping
     axis_map = {"x": 0, "y": 1, "z": 2}
     flip_idx = axis_map.get(mirror_axis, 0)
@@ -143,73 +153,76 @@ def mirror_controller_pose(objects=None, mirror_axis="x"):
     mirrored = []
     skipped = []
 
+    # Build every candidate name up front (in pattern priority order) so
+    # their existence can be resolved with a single ls() call.
+    pending = []
+    all_candidates = []
     for obj in objects:
         if not cmds.objExists(obj):
             skipped.append("{}: 不存在".format(obj))
             continue
-
         short = obj.rsplit("|", 1)[-1]
+        candidates = [
+            short.replace(src_pat, tgt_pat, 1)
+            for src_pat, tgt_pat in _MIRROR_PATTERNS
+            if src_pat in short
+        ]
+        pending.append((obj, short, candidates))
+        all_candidates.extend(candidates)
+
+    existing = set(cmds.ls(all_candidates) or []) if all_candidates else set()
+
+    with _fast_scene():
+        for obj, short, candidates in pending:
+            # Find the mirror target
+            target = next((c for c in candidates if c in existing), None)
+            if not target:
+                skipped.append("{}: 找不到镜像目标".format(short))
+                continue
 
-        # Find the mirror target
-        target = None
-        for src_pat, tgt_pat in mirror_patterns:
-            if src_pat in short:
-                candidate = short.replace(src_pat, tgt_pat, 1)
-                if cmds.objExists(candidate):
-                    target = candidate
-                    break
-
-        if not target:
-            skipped.append("{}: 找不到镜像目标".format(short))
-            continue
+            try:
+                # Get source transform values
+                tx = cmds.getAttr("{}.translateX".format(obj))
+                ty = cmds.getAttr("{}.translateY".format(obj))
+                tz = cmds.getAttr("{}.translateZ".format(obj))
+                rx = cmds.getAttr("{}.rotateX".format(obj))
+                ry = cmds.getAttr("{}.rotateY".format(obj))
+                rz = cmds.getAttr("{}.rotateZ".format(obj))
 
-        try:
-            # Get source transform values
-            tx = cmds.getAttr("{}.translateX".format(obj))
-            ty = cmds.getAttr("{}.translateY".format(obj))
-            tz = cmds.getAttr("{}.translateZ".format(obj))
-            rx = cmds.getAttr("{}.rotateX".format(obj))
-            ry = cmds.getAttr("{}.rotateY".format(obj))
-            rz = cmds.getAttr("{}.rotateZ".format(obj))
-
-            translate = [tx, ty, tz]
-            rotate = [rx, ry, rz]
-
-            # Flip the mirror axis for translate
-            translate[flip_idx] = -translate[flip_idx]
-
-            # Flip the non-mirror axes for rotate
-            for i in range(3):
-                if i != flip_idx:
-                    rotate[i] = -rotate[i]
-
-            # Apply to target (check settable)
-            t_attrs = ["translateX", "translateY", "translateZ"]
-            r_attrs = ["rotateX", "rotateY", "rotateZ"]
-
-            for attr, val in zip(t_attrs, translate):
-                full = "{}.{}".format(target, attr)
-                if cmds.getAttr(full, settable=True):
-                    cmds.setAttr(full, val)
-
-            for attr, val in zip(r_attrs, rotate):
-                full = "{}.{}".format(target, attr)
-                if cmds.getAttr(full, settable=True):
-                    cmds.setAttr(full, val)
-
-            mirrored.append("{} → {}".format(short, target))
-        except Exception as e:
-            skipped.append("{}: 错误 - {}".format(short, str(e)))
-
-    parts = []
-    if mirrored:
-        parts.append("已镜像:\n" + "\n".join(mirrored))
-    if skipped:
-        parts.append("跳过: {}".format("; ".join(skipped)))
+                translate = [tx, ty, tz]
+                rotate = [rx, ry, rz]
+
+                # Flip the mirror axis for translate
+                translate[flip_idx] = -translate[flip_idx]
+
+                # Flip the non-mirror axes for rotate
+                for i in range(3):
+                    if i != flip_idx:
+                        rotate[i] = -rotate[i]
+
+                # Apply to target (check settable)
+                t_attrs = ["translateX", "translateY", "translateZ"]
+                r_attrs = ["rotateX", "rotateY", "rotateZ"]
+
+                for attr, val in zip(t_attrs, translate):
+                    full = "{}.{}".format(target, attr)
+                    if cmds.getAttr(full, settable=True):
+                        cmds.setAttr(full, val)
+
+                for attr, val in zip(r_attrs, rotate):
+                    full = "{}.{}".format(target, attr)
+                    if cmds.getAttr(full, settable=True):
+                        cmds.setAttr(full, val)
+
+                mirrored.append("{} → {}".format(short, target))
+            except Exception as e:
+                skipped.append("{}: 错误 - {}".format(short, str(e)))
 
     return {
         "success": len(mirrored) > 0,
-        "message": "镜像 Pose 完成。\n" + "\n".join(parts) if parts else "无操作。",
+        "message": "镜像 Pose 完成: 已镜像 {} 个物体，跳过 {} 个。".format(
+            len(mirrored), len(skipped)),
+        "data": {"mirrored": mirrored, "skipped": skipped},
     }
 
 
@@ -217,6 +230,94 @@ def mirror_controller_pose(objects=None, mirror_axis="x"):
 # Tool: smooth_animation_curves
 # ---------------------------------------------------------------------------
 
+def _read_curve_keys(full_attr):
+    """Return (times, values) of the keys on `full_attr`, in UI units.
+
+    Reads straight from the animCurve through MFnAnimCurve when the plug is
+    driven by exactly one time-input curve; otherwise (anim layers, driven
+    keys, no animation) falls back to cmds.keyframe queries.
+    """
+    try:
+        sel_list = om2.MSelectionList()
+        sel_list.add(full_attr)
+        curves = oma.MAnimUtil.findAnimation(sel_list.getPlug(0))
+    except (RuntimeError, TypeError):
+        curves = []
+
+    curve_fn = oma.MFnAnimCurve(curves[0]) if len(curves) == 1 else None
+
+    # Driven-key (unitless input) curves have no time input for input(i)
+    if curve_fn is None or curve_fn.isUnitlessInput:
+        keys = cmds.keyframe(full_attr, query=True, timeChange=True) or []
+        values = cmds.keyframe(full_attr, query=True, valueChange=True) or []
+        return keys, values
+
+    count = curve_fn.numKeys
+    time_unit = om2.MTime.uiUnit()
+    keys = [curve_fn.input(i).asUnits(time_unit) for i in range(count)]
+    values = [curve_fn.value(i) for i in range(count)]
+
+    # The API works in internal units (cm, radians); cmds expects UI units
+    curve_type = curve_fn.animCurveType
+    if curve_type == oma.MFnAnimCurve.kAnimCurveTA:
+        values = [om2.MAngle.internalToUI(v) for v in values]
+    elif curve_type == oma.MFnAnimCurve.kAnimCurveTL:
+        values = [om2.MDistance.internalToUI(v) for v in values]
+    return keys, values
+
+
+@lru_cache(maxsize=32)
+def _smoothing_kernel(iterations):
+    """(2 * iterations + 1)-tap kernel equal to `iterations` passes of [1, 1, 1] / 3."""
+    kernel = np.full(3, 1.0 / 3.0)
+    result = kernel
+    for _ in range(iterations - 1):
+        result = np.convolve(result, kernel)
+    return result
+
+
+def _reflected(values, index):
+    """Value at `index` of `values` extended by point reflection about both end keys.
+
+    Filtering this extension with a symmetric kernel leaves the first and last
+    key unchanged, which is what the iterative 3-tap average does.
+    """
+    last = len(values) - 1
+    offset, sign = 0.0, 1.0
+    while True:
+        if index < 0:
+            offset += sign * 2.0 * values[0]
+            sign, index = -sign, -index
+        elif index > last:
+            offset += sign * 2.0 * values[last]
+            sign, index = -sign, 2 * last - index
+        else:
+            return offset + sign * values[index]
+
+
+def _smooth_values(values, iterations):
+    """Average each key with its neighbours `iterations` times, keeping both end keys."""
+    if iterations < 1:
+        return values
+
+    if np is None:
+        for _ in range(iterations):
+            new_values = list(values)
+            for i in range(1, len(values) - 1):
+                new_values[i] = (values[i - 1] + values[i] + values[i + 1]) / 3.0
+            values = new_values
+        return values
+
+    # One convolution with the pre-composed kernel replaces the passes
+    count = len(values)
+    padded = (
+        [_reflected(values, j) for j in range(-iterations, 0)]
+        + list(values)
+        + [_reflected(values, j) for j in range(count, count + iterations)]
+    )
+    return np.convolve(padded, _smoothing_kernel(iterations), mode="valid").tolist()
+
+
 @tool(
     name="smooth_animation_curves",
     description=(
@@ -261,51 +362,44 @@ def smooth_animation_curves(objects=None, iterations=3, attributes=None):
     smoothed = []
     skipped = []
 
-    for obj in objects:
-        if not cmds.objExists(obj):
-            skipped.append("{}: 不存在".format(obj))
-            continue
-
-        short = obj.rsplit("|", 1)[-1]
-        obj_smoothed = False
-
-        for attr in attributes:
-            full_attr = "{}.{}".format(obj, attr)
-
-            # Get all keyframe times
-            keys = cmds.keyframe(full_attr, query=True, timeChange=True) or []
-            if len(keys) < 3:
+    with _fast_scene():
+        for obj in objects:
+            if not cmds.objExists(obj):
+                skipped.append("{}: 不存在".format(obj))
                 continue
 
-            values = cmds.keyframe(full_attr, query=True, valueChange=True) or []
-            if len(values) != len(keys):
-                continue
+            short = obj.rsplit("|", 1)[-1]
+            obj_smoothed = False
 
-            # Iterative averaging (skip first/last key)
-            for _ in range(iterations):
-                new_values = list(values)
-                for i in range(1, len(values) - 1):
-                    new_values[i] = (values[i - 1] + values[i] + values[i + 1]) / 3.0
-                values = new_values
+            for attr in attributes:
+                full_attr = "{}.{}".format(obj, attr)
 
-            # Apply smoothed values
-            for t, v in zip(keys, values):
-                cmds.keyframe(full_attr, edit=True, time=(t, t), valueChange=v)
+                # Get all keyframe times and values
+                keys, values = _read_curve_keys(full_attr)
+                if len(keys) < 3 or len(values) != len(keys):
+                    continue
 
-            obj_smoothed = True
+                # Neighbour averaging (first/last key stay fixed)
+                values = _smooth_values(values, iterations)
 
-        if obj_smoothed:
-            smoothed.append(short)
-        else:
-            skipped.append("{}: 无足够关键帧".format(short))
+                # Apply smoothed values (end keys never change)
+                for t, v in zip(keys[1:-1], values[1:-1]):
+                    cmds.keyframe(full_attr, edit=True, time=(t, t), valueChange=v)
 
-    parts = []
-    if smoothed:
-        parts.append("已平滑 ({}次迭代): {}".format(iterations, ", ".join(smoothed)))
-    if skipped:
-        parts.append("跳过: {}".format("; ".join(skipped)))
+                obj_smoothed = True
+
+            if obj_smoothed:
+                smoothed.append(short)
+            else:
+                skipped.append("{}: 无足够关键帧".format(short))
 
     return {
         "success": len(smoothed) > 0,
-        "message": "动画平滑完成。\n" + "\n".join(parts) if parts else "无操作。",
+        "message": "动画平滑完成 ({}次迭代): 已平滑 {} 个物体，跳过 {} 个。".format(
+            iterations, len(smoothed), len(skipped)),
+        "data": {
+            "smoothed": smoothed,
+            "skipped": skipped,
+            "iterations": iterations,
+        },
     }
@@ -12,12 +12,30 @@ Safety:
     - Code length is limited to 50KB
 """
 
+import re
 import sys
+from functools import lru_cache
+
 import maya.cmds as cmds
 
 from ..tool_registry import tool
 
 
+# Calls that are refused outright. One case-insensitive alternation scans
+# the code in a single pass instead of one substring search per pattern.
+_DANGEROUS_RE = re.compile(
+    r"subprocess|os\.system|os\.popen|os\.exec|shutil\.rmtree"
+    r"|__import__\(['\"]os['\"]\)",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=128)
+def _compile_code(code):
+    """Compile a snippet once; retries of the same code reuse the code object."""
+    return compile(code, "<agent>", "exec")
+
+
 # ---------------------------------------------------------------------------
 # Tool: execute_python_code
 # ---------------------------------------------------------------------------
@@ -56,40 +74,38 @@ from ..tool_registry import tool
 )
 def execute_python_code(code=""):
     """Execute arbitrary Python code in Maya and capture output."""
-    if not code or not code.strip():
-        return {"success": False, "message": "代码为空，无法执行。"}
+    if not isinstance(code, str):
+        return {"success": False, "message": "代码必须是字符串。"}
 
-    # Safety: limit code length
+    # Safety: limit code length (checked first, before any scan of the text)
     if len(code) > 50000:
         return {"success": False, "message": "代码长度超过 50KB 限制。"}
 
+    if not code or code.isspace():
+        return {"success": False, "message": "代码为空，无法执行。"}
+
     # Safety: check for dangerous patterns
-    dangerous_patterns = [
-        "subprocess", "os.system", "os.popen", "os.exec",
-        "shutil.rmtree", "__import__('os')",
-    ]
-    code_lower = code.lower()
-    for pattern in dangerous_patterns:
-        if pattern.lower() in code_lower:
-            return {
-                "success": False,
-                "message": "检测到潜在危险操作: {}。出于安全考虑，此操作被禁止。".format(pattern),
-            }
+    match = _DANGEROUS_RE.search(code)
+    if match:
+        return {
+            "success": False,
+            "message": "检测到潜在危险操作: {}。出于安全考虑，此操作被禁止。".format(
+                match.group(0)),
+        }
 
     # Capture stdout
     class OutputCapture:
         def __init__(self):
             self.lines = []
-
-        def write(self, text):
-            if text and text.strip():
-                self.lines.append(text)
+            # Bind list.append directly: print() issues several small writes
+            # per call (including the bare "\n"), all of which are kept.
+            self.write = self.lines.append
 
         def flush(self):
             pass
 
         def get_output(self):
-            return "".join(self.lines)
+            return "".join(self.lines).strip()
 
     capture = OutputCapture()
     old_stdout = sys.stdout
@@ -104,7 +120,7 @@ def execute_python_code(code=""):
             "__builtins__": __builtins__,
             "cmds": cmds,
         }
-        exec(code, exec_globals)
+        exec(_compile_code(code), exec_globals)
 
         output = capture.get_output()
         if not output:
@@ -9,19 +9,62 @@ Includes:
 """
 
 import os
+from functools import lru_cache
+
 import maya.cmds as cmds
 import maya.mel as mel
 
 from ..tool_registry import tool
 
 
+# Set once fbxmaya is known to be loaded; cleared again when an FBX command
+# fails, in case the plugin was unloaded in the meantime.
+_FBX_LOADED = False
+
+
 def _ensure_fbx_plugin():
     """Ensure the FBX plugin is loaded."""
-    if not cmds.pluginInfo("fbxmaya", query=True, loaded=True):
-        try:
-            cmds.loadPlugin("fbxmaya")
-        except Exception:
-            pass
+    global _FBX_LOADED
+    if _FBX_LOADED:
+        return
+    if cmds.pluginInfo("fbxmaya", query=True, loaded=True):
+        _FBX_LOADED = True
+        return
+    try:
+        cmds.loadPlugin("fbxmaya", quiet=True)
+        _FBX_LOADED = True
+    except Exception:
+        pass
+
+
+def _mel_bool(value):
+    """Format a Python truth value as a MEL boolean literal."""
+    return "true" if value else "false"
+
+
+# Options that never change between exports
+_FBX_STATIC_EXPORT_OPTIONS = (
+    "FBXExportConstraints -v false;\n"
+    "FBXExportCameras -v false;\n"
+    "FBXExportLights -v false;"
+)
+
+
+@lru_cache(maxsize=32)
+def _fbx_export_options_script(smoothing_groups, input_connections, skins,
+                               blendshapes, animation, frame_range):
+    """Build (once per option combination) the MEL that configures FBXExport."""
+    opts = [
+        'FBXExportSmoothingGroups -v {}'.format(_mel_bool(smoothing_groups)),
+        'FBXExportInputConnections -v {}'.format(_mel_bool(input_connections)),
+        'FBXExportSkins -v {}'.format(_mel_bool(skins)),
+        'FBXExportShapes -v {}'.format(_mel_bool(blendshapes)),
+        'FBXExportBakeComplexAnimation -v {}'.format(_mel_bool(animation)),
+    ]
+    if frame_range is not None:
+        opts.append('FBXExportBakeComplexStart -v {}'.format(frame_range[0]))
+        opts.append('FBXExportBakeComplexEnd -v {}'.format(frame_range[1]))
+    return ";\n".join(opts) + ";\n" + _FBX_STATIC_EXPORT_OPTIONS
 
 
 # ---------------------------------------------------------------------------
@@ -83,6 +126,7 @@ def export_fbx(file_path="", export_selected=True, animation=True,
                blendshapes=True, smoothing_groups=True,
                input_connections=True):
     """Export scene or selection as FBX."""
+    global _FBX_LOADED
     if not file_path:
         return {"success": False, "message": "请指定导出文件路径。"}
 
@@ -100,27 +144,13 @@ def export_fbx(file_path="", export_selected=True, animation=True,
             return {"success": False, "message": "无法创建目录: {}".format(str(e))}
 
     try:
-        # Set FBX export options
-        mel.eval('FBXExportSmoothingGroups -v {}'.format(
-            "true" if smoothing_groups else "false"))
-        mel.eval('FBXExportInputConnections -v {}'.format(
-            "true" if input_connections else "false"))
-        mel.eval('FBXExportSkins -v {}'.format(
-            "true" if skins else "false"))
-        mel.eval('FBXExportShapes -v {}'.format(
-            "true" if blendshapes else "false"))
-
-        if animation:
-            mel.eval('FBXExportBakeComplexAnimation -v true')
-            if start_frame is not None and end_frame is not None:
-                mel.eval('FBXExportBakeComplexStart -v {}'.format(int(start_frame)))
-                mel.eval('FBXExportBakeComplexEnd -v {}'.format(int(end_frame)))
-        else:
-            mel.eval('FBXExportBakeComplexAnimation -v false')
-
-        mel.eval('FBXExportConstraints -v false')
-        mel.eval('FBXExportCameras -v false')
-        mel.eval('FBXExportLights -v false')
+        # Set FBX export options in a single MEL round-trip
+        frame_range = None
+        if animation and start_frame is not None and end_frame is not None:
+            frame_range = (int(start_frame), int(end_frame))
+        mel.eval(_fbx_export_options_script(
+            bool(smoothing_groups), bool(input_connections), bool(skins),
+            bool(blendshapes), bool(animation), frame_range))
 
         # Export
         if export_selected:
@@ -134,6 +164,7 @@ def export_fbx(file_path="", export_selected=True, animation=True,
         }
 
     except Exception as e:
+        _FBX_LOADED = False
         return {"success": False, "message": "FBX 导出失败: {}".format(str(e))}
 
 
@@ -164,6 +195,7 @@ def export_fbx(file_path="", export_selected=True, animation=True,
 )
 def import_fbx(file_path="", merge_mode="add"):
     """Import FBX file into the current scene."""
+    global _FBX_LOADED
     if not file_path:
         return {"success": False, "message": "请指定 FBX 文件路径。"}
 
@@ -175,15 +207,15 @@ def import_fbx(file_path="", merge_mode="add"):
     _ensure_fbx_plugin()
 
     try:
-        # Count objects before import
-        before = set(cmds.ls(dag=True, long=True) or [])
-
         mel.eval('FBXImportMode -v {}'.format(merge_mode))
-        mel.eval('FBXImport -f "{}"'.format(file_path))
 
-        # Count new objects
-        after = set(cmds.ls(dag=True, long=True) or [])
-        new_objects = after - before
+        # returnNewNodes reports what the import created, so the scene does
+        # not have to be listed before and after to diff the DAG
+        new_nodes = cmds.file(
+            file_path, i=True, type="FBX", returnNewNodes=True,
+            mergeNamespacesOnClash=False, namespace=":",
+        ) or []
+        new_objects = cmds.ls(new_nodes, type="dagNode") or []
 
         return {
             "success": True,
@@ -192,4 +224,5 @@ def import_fbx(file_path="", merge_mode="add"):
         }
 
     except Exception as e:
+        _FBX_LOADED = False
         return {"success": False, "message": "FBX 导入失败: {}".format(str(e))}
@@ -11,15 +11,111 @@ IMPORTANT: These functions do NOT manage undo chunks or thread safety themselves
            That is handled by the ActionExecutor.
 """
 
+from contextlib import contextmanager
+
+import maya.api.OpenMaya as om2
 import maya.cmds as cmds
+import maya.mel as mel
 
 from ..tool_registry import tool
 
 
+@contextmanager
+def _fast_scene():
+    """Pause evaluation and UI refresh while a tool edits many nodes.
+
+    Switches the Evaluation Manager to DG mode, suspends viewport refresh,
+    disables cycle checking and unmanages the main pane so each setAttr /
+    setKeyframe does not trigger graph rebuilds and redraws. Everything is
+    restored on exit, even if the body raises.
+
+    Undo is left untouched on purpose: ActionExecutor wraps every tool in a
+    single undo chunk, and turning the queue off would make the tool
+    impossible to undo.
+    """
+    prev_mode = None
+    prev_cycle_check = None
+    pane_hidden = False
+    refresh_suspended = False
+    try:
+        try:
+            prev_mode = cmds.evaluationManager(query=True, mode=True)[0]
+            cmds.evaluationManager(mode="off")
+        except Exception:
+            prev_mode = None
+        try:
+            prev_cycle_check = cmds.cycleCheck(query=True, evaluation=True)
+            cmds.cycleCheck(evaluation=False)
+        except Exception:
+            prev_cycle_check = None
+        if not cmds.about(batch=True):
+            try:
+                mel.eval("paneLayout -e -manage false $gMainPane")
+                pane_hidden = True
+            except Exception:
+                pass
+        cmds.refresh(suspend=True)
+        refresh_suspended = True
+        yield
+    finally:
+        if refresh_suspended:
+            cmds.refresh(suspend=False)
+        if pane_hidden:
+            try:
+                mel.eval("paneLayout -e -manage true $gMainPane")
+            except Exception:
+                pass
+        if prev_cycle_check is not None:
+            cmds.cycleCheck(evaluation=prev_cycle_check)
+        if prev_mode is not None:
+            cmds.evaluationManager(mode=prev_mode)
+
+
+def missing_nodes(names):
+    """Return the names in `names` that do not exist, in input order.
+
+    Shared by the tool modules. One cmds.ls(long=True) covers the whole
+    list; every trailing path of each long name it returns ("a", "grp|a",
+    "|grp|a") counts as found, so short names and full paths are matched
+    in the same namespace without a per-name objExists.
+    """
+    found = set()
+    for path in cmds.ls(names, long=True) or []:
+        parts = path.split("|")
+        found.update("|".join(parts[i:]) for i in range(len(parts)))
+    return [n for n in names if n not in found]
+
+
 # ---------------------------------------------------------------------------
 # Tool: zero_out_transforms
 # ---------------------------------------------------------------------------
 
+# (compound attribute, child channels, rest value)
+_ZERO_CHANNELS = (
+    ("translate", ("tx", "ty", "tz"), 0),
+    ("rotate", ("rx", "ry", "rz"), 0),
+    ("scale", ("sx", "sy", "sz"), 1),
+)
+
+
+def _set_channels(obj, compound, channels, value):
+    """Set all channels of a compound attribute, skipping locked ones.
+
+    Tries the whole compound in one setAttr first; only when that fails
+    (a locked or connected child) falls back to setting each channel.
+    """
+    try:
+        cmds.setAttr("{}.{}".format(obj, compound), value, value, value)
+        return
+    except RuntimeError:
+        pass
+    for attr in channels:
+        try:
+            cmds.setAttr("{}.{}".format(obj, attr), value)
+        except RuntimeError:
+            pass
+
+
 @tool(
     name="zero_out_transforms",
     description=(
@@ -46,23 +142,17 @@ def zero_out_transforms(objects=None):
         return {"success": False, "message": "没有指定物体，也没有选中任何物体。"}
 
     results = []
-    for obj in objects:
-        if not cmds.objExists(obj):
-            results.append("{}: 不存在".format(obj))
-            continue
-        try:
-            # Check if attributes are settable (not locked/connected)
-            for attr in ["tx", "ty", "tz", "rx", "ry", "rz"]:
-                full_attr = "{}.{}".format(obj, attr)
-                if cmds.getAttr(full_attr, settable=True):
-                    cmds.setAttr(full_attr, 0)
-            for attr in ["sx", "sy", "sz"]:
-                full_attr = "{}.{}".format(obj, attr)
-                if cmds.getAttr(full_attr, settable=True):
-                    cmds.setAttr(full_attr, 1)
-            results.append("{}: 已归零".format(obj.rsplit("|", 1)[-1]))
-        except Exception as e:
-            results.append("{}: 错误 - {}".format(obj.rsplit("|", 1)[-1], str(e)))
+    with _fast_scene():
+        for obj in objects:
+            if not cmds.objExists(obj):
+                results.append("{}: 不存在".format(obj))
+                continue
+            try:
+                for compound, channels, value in _ZERO_CHANNELS:
+                    _set_channels(obj, compound, channels, value)
+                results.append("{}: 已归零".format(obj.rsplit("|", 1)[-1]))
+            except Exception as e:
+                results.append("{}: 错误 - {}".format(obj.rsplit("|", 1)[-1], str(e)))
 
     return {
         "success": True,
@@ -74,6 +164,61 @@ def zero_out_transforms(objects=None):
 # Tool: create_locator_at_selection
 # ---------------------------------------------------------------------------
 
+def _world_transforms(nodes):
+    """Read world translation/rotation of DAG nodes through OpenMaya.
+
+    Reads every node from one MSelectionList instead of two xform queries
+    per node. Values are converted to UI units (rotation as XYZ euler) so
+    they can be passed straight to cmds.xform. Non-DAG nodes are skipped.
+
+    Components (e.g. pCube1.vtx[3]) would resolve to their shape's DAG
+    path, so they are read with xform instead and placed at the centroid
+    of their world positions, with no rotation.
+
+    Returns:
+        list[tuple]: ((tx, ty, tz), (rx, ry, rz)) per placed item, in
+        input order.
+    """
+    sel_list = om2.MSelectionList()
+    # Per input: the component name, or its index in sel_list
+    items = []
+    for node in nodes:
+        if "." in node:
+            items.append(node)
+            continue
+        before = sel_list.length()
+        sel_list.add(node)
+        if sel_list.length() > before:
+            items.append(before)
+
+    to_ui_dist = om2.MDistance.internalToUI
+    to_ui_angle = om2.MAngle.internalToUI
+    result = []
+    for item in items:
+        if isinstance(item, str):
+            points = cmds.xform(item, query=True, worldSpace=True, translation=True) or []
+            count = len(points) // 3
+            if not count:
+                continue
+            result.append((
+                tuple(sum(points[axis::3]) / count for axis in range(3)),
+                (0.0, 0.0, 0.0),
+            ))
+            continue
+        try:
+            dag = sel_list.getDagPath(item)
+        except TypeError:
+            continue
+        matrix = om2.MTransformationMatrix(dag.inclusiveMatrix())
+        pos = matrix.translation(om2.MSpace.kWorld)
+        rot = matrix.rotation()
+        result.append((
+            (to_ui_dist(pos.x), to_ui_dist(pos.y), to_ui_dist(pos.z)),
+            (to_ui_angle(rot.x), to_ui_angle(rot.y), to_ui_angle(rot.z)),
+        ))
+    return result
+
+
 @tool(
     name="create_locator_at_selection",
     description=(
@@ -102,14 +247,11 @@ def create_locator_at_selection(name_prefix="ai_locator"):
         loc = cmds.spaceLocator(name="{}_01".format(name_prefix))[0]
         created.append(loc)
     else:
-        for i, obj in enumerate(sel, 1):
-            pos = cmds.xform(obj, query=True, worldSpace=True, translation=True)
-            rot = cmds.xform(obj, query=True, worldSpace=True, rotation=True)
+        for i, (pos, rot) in enumerate(_world_transforms(sel), 1):
             loc = cmds.spaceLocator(
                 name="{}_{:02d}".format(name_prefix, i)
             )[0]
-            cmds.xform(loc, worldSpace=True, translation=pos)
-            cmds.xform(loc, worldSpace=True, rotation=rot)
+            cmds.xform(loc, worldSpace=True, translation=pos, rotation=rot)
             created.append(loc)
 
     return {
@@ -169,15 +311,22 @@ def set_keyframe(objects=None, frame=None, attributes=None):
     if attributes:
         kwargs["attribute"] = attributes
 
+    existing = cmds.ls(objects, long=True) or []
     keyed = []
-    for obj in objects:
-        if not cmds.objExists(obj):
-            continue
-        try:
-            cmds.setKeyframe(obj, **kwargs)
-            keyed.append(obj.rsplit("|", 1)[-1])
-        except Exception as e:
-            keyed.append("{}: 错误 - {}".format(obj.rsplit("|", 1)[-1], str(e)))
+    if existing:
+        with _fast_scene():
+            try:
+                cmds.setKeyframe(existing, **kwargs)
+                keyed = [obj.rsplit("|", 1)[-1] for obj in existing]
+            except Exception:
+                # Key one by one to find the object that failed
+                for obj in existing:
+                    try:
+                        cmds.setKeyframe(obj, **kwargs)
+                        keyed.append(obj.rsplit("|", 1)[-1])
+                    except Exception as e:
+                        keyed.append("{}: 错误 - {}".format(
+                            obj.rsplit("|", 1)[-1], str(e)))
 
     frame_str = "帧 {}".format(frame) if frame is not None else "当前帧"
     attr_str = ", ".join(attributes) if attributes else "所有可 key 属性"
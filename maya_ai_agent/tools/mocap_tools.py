@@ -7,20 +7,55 @@ Provides AI-accessible wrappers for:
     - Finger cleanup
 """
 
+import importlib
 import sys
 import os
 
 from ..tool_registry import tool
+from .maya_tools import missing_nodes
+
+
+# True once ai_mocap_toolkit has been found. A failed lookup is not cached,
+# so installing the toolkit mid-session still works without a restart.
+_TOOLKIT_READY = False
+
+# Toolkit submodules already imported, keyed by dotted name
+_TOOLKIT_MODULES = {}
+
+
+def _ok(message):
+    """Build a successful tool result."""
+    return {"success": True, "message": message}
+
+
+def _fail(message):
+    """Build a failed tool result."""
+    return {"success": False, "message": message}
 
 
 def _ensure_toolkit_path():
     """Ensure ai_mocap_toolkit is importable."""
-    # The toolkit lives alongside the Maya Agent project
-    toolkit_candidates = [
-        os.path.normpath(os.path.join(
-            os.path.dirname(__file__), "..", "..", "..", "..", "ai_mocap_toolkit"
-        )),
-    ]
+    global _TOOLKIT_READY
+    if _TOOLKIT_READY:
+        return True
+    _TOOLKIT_READY = _find_toolkit()
+    return _TOOLKIT_READY
+
+
+def _toolkit_module(name):
+    """Import a toolkit submodule once and reuse it on later calls."""
+    module = _TOOLKIT_MODULES.get(name)
+    if module is None:
+        module = _TOOLKIT_MODULES[name] = importlib.import_module(name)
+    return module
+
+
+def _find_toolkit():
+    """Locate ai_mocap_toolkit, adding its parent directory to sys.path."""
+    # Already imported (e.g. by the toolkit's own UI): no import machinery needed
+    if "ai_mocap_toolkit" in sys.modules:
+        return True
+
     # Check if already importable
     try:
         import ai_mocap_toolkit
@@ -28,6 +63,13 @@ def _ensure_toolkit_path():
     except ImportError:
         pass
 
+    # The toolkit lives alongside the Maya Agent project
+    toolkit_candidates = [
+        os.path.normpath(os.path.join(
+            os.path.dirname(__file__), "..", "..", "..", "..", "ai_mocap_toolkit"
+        )),
+    ]
+
     # Try adding parent directories to sys.path
     for candidate in toolkit_candidates:
         parent = os.path.dirname(candidate)
@@ -98,23 +140,19 @@ def generate_root_motion(root_joint="root", pelvis_joint="pelvis",
                          extract_tx=True, extract_tz=True, extract_ty=False,
                          extract_yaw=True, smooth_iterations=0, zero_start=True):
     """Generate root motion from pelvis movement."""
-    import maya.cmds as cmds
-
     if not _ensure_toolkit_path():
-        return {
-            "success": False,
-            "message": "ai_mocap_toolkit 未找到。请确保工具包在正确路径下。",
-        }
+        return _fail("ai_mocap_toolkit 未找到。请确保工具包在正确路径下。")
 
     # Validate joints exist
+    missing = missing_nodes([root_joint, pelvis_joint])
     for jnt_name, label in [(root_joint, "Root"), (pelvis_joint, "Pelvis")]:
-        if not cmds.objExists(jnt_name):
-            return {"success": False, "message": "{} 骨骼 '{}' 不存在。".format(label, jnt_name)}
+        if jnt_name in missing:
+            return _fail(f"{label} 骨骼 '{jnt_name}' 不存在。")
 
     try:
-        from ai_mocap_toolkit.core.root_motion import RootMotionConfig, generate_root_motion as _gen
+        root_motion = _toolkit_module("ai_mocap_toolkit.core.root_motion")
 
-        config = RootMotionConfig()
+        config = root_motion.RootMotionConfig()
         config.root_joint = root_joint
         config.pelvis_joint = pelvis_joint
         config.extract_tx = extract_tx
@@ -124,16 +162,12 @@ def generate_root_motion(root_joint="root", pelvis_joint="pelvis",
         config.smooth_iterations = smooth_iterations
         config.zero_start = zero_start
 
-        result = _gen(config)
+        result = root_motion.generate_root_motion(config)
 
-        return {
-            "success": True,
-            "message": "Root Motion 生成完成。已从 {} 提取位移到 {}。".format(
-                pelvis_joint, root_joint),
-        }
+        return _ok(f"Root Motion 生成完成。已从 {pelvis_joint} 提取位移到 {root_joint}。")
 
     except Exception as e:
-        return {"success": False, "message": "Root Motion 生成失败: {}".format(str(e))}
+        return _fail(f"Root Motion 生成失败: {e}")
 
 
 # ---------------------------------------------------------------------------
@@ -182,32 +216,23 @@ def cleanup_finger_animation(hand_side="both", smooth_strength=0.5,
                              suppress_twist=True):
     """Clean up finger animation noise from AI mocap data."""
     if not _ensure_toolkit_path():
-        return {
-            "success": False,
-            "message": "ai_mocap_toolkit 未找到。请确保工具包在正确路径下。",
-        }
+        return _fail("ai_mocap_toolkit 未找到。请确保工具包在正确路径下。")
 
     try:
-        from ai_mocap_toolkit.core.finger_cleanup import FingerCleanupConfig, cleanup_fingers
+        finger_cleanup = _toolkit_module("ai_mocap_toolkit.core.finger_cleanup")
 
-        config = FingerCleanupConfig()
+        config = finger_cleanup.FingerCleanupConfig()
         config.hand_side = hand_side
         config.smooth_strength = smooth_strength
         config.clamp_angles = clamp_angles
         config.suppress_spread = suppress_spread
         config.suppress_twist = suppress_twist
 
-        result = cleanup_fingers(config)
+        result = finger_cleanup.cleanup_fingers(config)
 
-        return {
-            "success": True,
-            "message": "手指动画清理完成 (手部: {})。".format(hand_side),
-        }
+        return _ok(f"手指动画清理完成 (手部: {hand_side})。")
 
     except ImportError:
-        return {
-            "success": False,
-            "message": "ai_mocap_toolkit.core.finger_cleanup 模块导入失败。请检查安装。",
-        }
+        return _fail("ai_mocap_toolkit.core.finger_cleanup 模块导入失败。请检查安装。")
     except Exception as e:
-        return {"success": False, "message": "手指动画清理失败: {}".format(str(e))}
+        return _fail(f"手指动画清理失败: {e}")
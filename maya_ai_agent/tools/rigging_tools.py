@@ -11,9 +11,42 @@ Includes:
     - Joint orient
 """
 
+from contextlib import contextmanager
+
 import maya.cmds as cmds
 
 from ..tool_registry import tool
+from .maya_tools import _fast_scene, missing_nodes
+
+
+def _ok(message):
+    """Build a successful tool result."""
+    return {"success": True, "message": message}
+
+
+def _fail(message):
+    """Build a failed tool result."""
+    return {"success": False, "message": message}
+
+
+@contextmanager
+def _kept_selection():
+    """Restore the user's selection once the body is done, even on error."""
+    prev_sel = cmds.ls(selection=True) or []
+    try:
+        yield
+    finally:
+        if prev_sel:
+            cmds.select(prev_sel, replace=True)
+        else:
+            cmds.select(clear=True)
+
+
+def _short_list(names, limit=5):
+    """Join up to `limit` names for a message, summarising the rest as a count."""
+    if len(names) <= limit:
+        return ", ".join(names)
+    return f"{', '.join(names[:limit])}, ... (+{len(names) - limit})"
 
 
 # ---------------------------------------------------------------------------
@@ -57,40 +90,41 @@ from ..tool_registry import tool
 def create_joints(joints=None, parent=None):
     """Create a joint chain with specified positions."""
     if not joints:
-        return {"success": False, "message": "未指定骨骼列表。"}
+        return _fail("未指定骨骼列表。")
+
+    if parent and not cmds.objExists(parent):
+        return _fail(f"父骨骼 '{parent}' 不存在。")
 
     created = []
     errors = []
 
-    cmds.select(clear=True)
-
-    if parent:
-        if not cmds.objExists(parent):
-            return {"success": False, "message": "父骨骼 '{}' 不存在。".format(parent)}
-        cmds.select(parent)
-
-    for jnt_info in joints:
-        name = jnt_info.get("name", "joint1")
-        pos = jnt_info.get("position", [0, 0, 0])
-
-        try:
-            jnt = cmds.joint(name=name, position=pos)
-            created.append(jnt)
-        except Exception as e:
-            errors.append("{}: {}".format(name, str(e)))
-
-    cmds.select(clear=True)
+    with _kept_selection():
+        # cmds.joint parents each new joint under the selection
+        if parent:
+            cmds.select(parent, replace=True)
+        else:
+            cmds.select(clear=True)
+
+        # Build the whole chain with evaluation and redraw paused
+        with _fast_scene():
+            for jnt_info in joints:
+                name = jnt_info.get("name", "joint1")
+                pos = jnt_info.get("position", [0, 0, 0])
+
+                try:
+                    jnt = cmds.joint(name=name, position=pos)
+                    created.append(jnt)
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
 
     parts = []
     if created:
-        parts.append("已创建 {} 个骨骼: {}".format(len(created), ", ".join(created)))
+        parts.append(f"已创建 {len(created)} 个骨骼: {_short_list(created)}")
     if errors:
-        parts.append("错误: {}".format("; ".join(errors)))
+        parts.append(f"错误: {'; '.join(errors)}")
 
-    return {
-        "success": len(created) > 0,
-        "message": "\n".join(parts) if parts else "无操作。",
-    }
+    message = "\n".join(parts) if parts else "无操作。"
+    return _ok(message) if created else _fail(message)
 
 
 # ---------------------------------------------------------------------------
@@ -130,40 +164,40 @@ def create_joints(joints=None, parent=None):
 def bind_skin(mesh=None, joints=None, max_influences=4, bind_method=0):
     """Bind skin (smooth bind) mesh to joints."""
     if not mesh and not joints:
-        sel = cmds.ls(selection=True, long=True) or []
+        # ls already returns the shortest unique path, so names stay unambiguous
+        sel = cmds.ls(selection=True) or []
         if len(sel) < 2:
-            return {"success": False, "message": "请选择骨骼和网格，或指定 mesh 和 joints 参数。"}
+            return _fail("请选择骨骼和网格，或指定 mesh 和 joints 参数。")
         # Assume last selected is mesh, rest are joints
         mesh = sel[-1]
         joints = sel[:-1]
 
     if not mesh:
-        return {"success": False, "message": "未指定网格。"}
+        return _fail("未指定网格。")
 
     if not cmds.objExists(mesh):
-        return {"success": False, "message": "网格 '{}' 不存在。".format(mesh)}
+        return _fail(f"网格 '{mesh}' 不存在。")
 
     try:
         bind_args = [mesh]
         if joints:
             bind_args = joints + [mesh]
 
-        skin_cluster = cmds.skinCluster(
-            *bind_args,
-            toSelectedBones=not bool(joints),
-            bindMethod=bind_method,
-            skinMethod=0,
-            normalizeWeights=1,
-            maximumInfluences=max_influences,
-            obeyMaxInfluences=True,
-        )
-
-        return {
-            "success": True,
-            "message": "已绑定蒙皮: {} → skinCluster: {}".format(mesh, skin_cluster[0]),
-        }
+        # Keep the viewport and evaluation graph out of the bind
+        with _kept_selection(), _fast_scene():
+            skin_cluster = cmds.skinCluster(
+                *bind_args,
+                toSelectedBones=not bool(joints),
+                bindMethod=bind_method,
+                skinMethod=0,
+                normalizeWeights=1,
+                maximumInfluences=max_influences,
+                obeyMaxInfluences=True,
+            )
+
+        return _ok(f"已绑定蒙皮: {mesh} → skinCluster: {skin_cluster[0]}")
     except Exception as e:
-        return {"success": False, "message": "绑定蒙皮失败: {}".format(str(e))}
+        return _fail(f"绑定蒙皮失败: {e}")
 
 
 # ---------------------------------------------------------------------------
@@ -174,7 +208,9 @@ def bind_skin(mesh=None, joints=None, max_influences=4, bind_method=0):
     name="copy_skin_weights",
     description=(
         "从源网格复制蒙皮权重到目标网格。\n"
-        "两个网格都必须已经绑定蒙皮(有skinCluster)。"
+        "两个网格都必须已经绑定蒙皮(有skinCluster)。\n"
+        "如果两个网格 UV 布局一致（如重拓扑、LOD、同拓扑变体），"
+        "建议设置 uv_space=true：按 UV 直接对应，比默认的最近点搜索快得多。"
     ),
     parameters={
         "type": "object",
@@ -195,55 +231,88 @@ def bind_skin(mesh=None, joints=None, max_influences=4, bind_method=0):
                 "type": "string",
                 "description": "骨骼关联: 'closestJoint'(默认), 'name', 'label', 'oneToOne'。",
             },
+            "uv_space": {
+                "type": "boolean",
+                "description": "是否按 UV 空间关联（使用两个网格的当前 UV 集）。默认 false。",
+            },
         },
         "required": ["source", "target"],
     },
 )
 def copy_skin_weights(source="", target="", surface_association="closestPoint",
-                      influence_association="closestJoint"):
+                      influence_association="closestJoint", uv_space=False):
     """Copy skin weights from source mesh to target mesh."""
     if not source or not target:
-        return {"success": False, "message": "请指定源网格和目标网格。"}
+        return _fail("请指定源网格和目标网格。")
 
-    for name in [source, target]:
-        if not cmds.objExists(name):
-            return {"success": False, "message": "'{}' 不存在。".format(name)}
+    missing = missing_nodes([source, target])
+    if missing:
+        return _fail(f"'{missing[0]}' 不存在。")
 
     def _find_skin_cluster(mesh_name):
         """Find the skinCluster node attached to a mesh."""
+        # Common case: the skinCluster feeds the shape's inMesh directly
+        shapes = cmds.ls(mesh_name, shapes=True) or cmds.listRelatives(
+            mesh_name, shapes=True, noIntermediate=True, fullPath=True) or []
+        for shape in shapes:
+            clusters = cmds.listConnections(
+                shape + ".inMesh", type="skinCluster",
+                source=True, destination=False) or []
+            if clusters:
+                return clusters[0]
+
+        # Other deformers sit after the skinCluster: walk the history
         history = cmds.listHistory(mesh_name, pruneDagObjects=True) or []
         clusters = cmds.ls(history, type="skinCluster") or []
         return clusters[0] if clusters else None
 
     src_skin = _find_skin_cluster(source)
     if not src_skin:
-        return {"success": False, "message": "源网格 '{}' 没有 skinCluster。".format(source)}
+        return _fail(f"源网格 '{source}' 没有 skinCluster。")
 
     dst_skin = _find_skin_cluster(target)
     if not dst_skin:
-        return {"success": False, "message": "目标网格 '{}' 没有 skinCluster。".format(target)}
+        return _fail(f"目标网格 '{target}' 没有 skinCluster。")
+
+    def _current_uv_set(mesh_name):
+        """Current UV set of a mesh, 'map1' if it cannot be queried."""
+        uv_sets = cmds.polyUVSet(mesh_name, query=True, currentUVSet=True) or []
+        return uv_sets[0] if uv_sets else "map1"
 
     try:
-        cmds.copySkinWeights(
-            sourceSkin=src_skin,
-            destinationSkin=dst_skin,
-            noMirror=True,
-            surfaceAssociation=surface_association,
-            influenceAssociation=influence_association,
-        )
-        return {
-            "success": True,
-            "message": "已从 {} ({}) 复制蒙皮权重到 {} ({})。".format(
-                source, src_skin, target, dst_skin),
+        kwargs = {
+            "sourceSkin": src_skin,
+            "destinationSkin": dst_skin,
+            "noMirror": True,
+            "surfaceAssociation": surface_association,
+            "influenceAssociation": influence_association,
         }
+        if uv_space:
+            # Match points through UV coordinates instead of a spatial search
+            kwargs["uvSpace"] = (_current_uv_set(source), _current_uv_set(target))
+
+        cmds.copySkinWeights(**kwargs)
+        return _ok(
+            f"已从 {source} ({src_skin}) 复制蒙皮权重到 {target} ({dst_skin})。")
     except Exception as e:
-        return {"success": False, "message": "复制蒙皮权重失败: {}".format(str(e))}
+        return _fail(f"复制蒙皮权重失败: {e}")
 
 
 # ---------------------------------------------------------------------------
 # Tool: create_constraint
 # ---------------------------------------------------------------------------
 
+# constraint_type -> cmds command
+_CONSTRAINT_FUNCS = {
+    "parent": cmds.parentConstraint,
+    "point": cmds.pointConstraint,
+    "orient": cmds.orientConstraint,
+    "scale": cmds.scaleConstraint,
+    "aim": cmds.aimConstraint,
+    "poleVector": cmds.poleVectorConstraint,
+}
+
+
 @tool(
     name="create_constraint",
     description=(
@@ -284,24 +353,11 @@ def create_constraint(constraint_type="parent", driver="", target="",
                       maintain_offset=True):
     """Create a constraint between objects."""
     if not driver or not target:
-        return {"success": False, "message": "请指定驱动物体和目标物体。"}
-
-    for name in [driver, target]:
-        if not cmds.objExists(name):
-            return {"success": False, "message": "'{}' 不存在。".format(name)}
-
-    constraint_funcs = {
-        "parent": cmds.parentConstraint,
-        "point": cmds.pointConstraint,
-        "orient": cmds.orientConstraint,
-        "scale": cmds.scaleConstraint,
-        "aim": cmds.aimConstraint,
-        "poleVector": cmds.poleVectorConstraint,
-    }
-
-    func = constraint_funcs.get(constraint_type)
+        return _fail("请指定驱动物体和目标物体。")
+
+    func = _CONSTRAINT_FUNCS.get(constraint_type)
     if not func:
-        return {"success": False, "message": "不支持的约束类型: {}".format(constraint_type)}
+        return _fail(f"不支持的约束类型: {constraint_type}")
 
     try:
         kwargs = {"maintainOffset": maintain_offset}
@@ -309,13 +365,37 @@ def create_constraint(constraint_type="parent", driver="", target="",
             kwargs = {}  # poleVector doesn't support maintainOffset
 
         result = func(driver, target, **kwargs)
-        return {
-            "success": True,
-            "message": "已创建 {} 约束: {} → {} ({})".format(
-                constraint_type, driver, target, result[0]),
-        }
+        return _ok(
+            f"已创建 {constraint_type} 约束: {driver} → {target} ({result[0]})")
     except Exception as e:
-        return {"success": False, "message": "创建约束失败: {}".format(str(e))}
+        # Missing nodes are only looked up once the command has failed
+        missing = missing_nodes([driver, target])
+        if missing:
+            return _fail(f"'{missing[0]}' 不存在。")
+        return _fail(f"创建约束失败: {e}")
+
+
+# Set once the Evaluation Manager has been put in parallel mode this session
+_PARALLEL_EM_SET = False
+
+
+def _ensure_parallel_evaluation():
+    """Switch the Evaluation Manager to parallel mode, once per session.
+
+    This is a global, scene-wide setting: it affects every rig in the scene,
+    not just the chain being created. Returns True if the mode was changed.
+    """
+    global _PARALLEL_EM_SET
+    if _PARALLEL_EM_SET:
+        return False
+    _PARALLEL_EM_SET = True
+    try:
+        if cmds.evaluationManager(query=True, mode=True)[0] == "parallel":
+            return False
+        cmds.evaluationManager(mode="parallel")
+        return True
+    except Exception:
+        return False
 
 
 # ---------------------------------------------------------------------------
@@ -354,11 +434,7 @@ def create_constraint(constraint_type="parent", driver="", target="",
 def create_ik_handle(start_joint="", end_joint="", solver="ikRPsolver", name=None):
     """Create an IK handle."""
     if not start_joint or not end_joint:
-        return {"success": False, "message": "请指定起始骨骼和末端骨骼。"}
-
-    for jnt in [start_joint, end_joint]:
-        if not cmds.objExists(jnt):
-            return {"success": False, "message": "骨骼 '{}' 不存在。".format(jnt)}
+        return _fail("请指定起始骨骼和末端骨骼。")
 
     try:
         kwargs = {
@@ -370,12 +446,18 @@ def create_ik_handle(start_joint="", end_joint="", solver="ikRPsolver", name=Non
             kwargs["name"] = name
 
         result = cmds.ikHandle(**kwargs)
-        return {
-            "success": True,
-            "message": "已创建 IK 句柄: {} (solver: {})".format(result[0], solver),
-        }
+
+        # Let independent IK chains solve on separate threads at playback
+        message = f"已创建 IK 句柄: {result[0]} (solver: {solver})"
+        if _ensure_parallel_evaluation():
+            message += "\n已将 Evaluation Manager 切换为 parallel 模式（全局设置）。"
+        return _ok(message)
     except Exception as e:
-        return {"success": False, "message": "创建 IK 句柄失败: {}".format(str(e))}
+        # Missing joints are only looked up once the command has failed
+        missing = missing_nodes([start_joint, end_joint])
+        if missing:
+            return _fail(f"骨骼 '{missing[0]}' 不存在。")
+        return _fail(f"创建 IK 句柄失败: {e}")
 
 
 # ---------------------------------------------------------------------------
@@ -411,14 +493,14 @@ def create_ik_handle(start_joint="", end_joint="", solver="ikRPsolver", name=Non
 def add_blendshape(base_mesh="", target_meshes=None, name=None):
     """Add BlendShape deformer to mesh."""
     if not base_mesh or not target_meshes:
-        return {"success": False, "message": "请指定基础网格和目标网格列表。"}
+        return _fail("请指定基础网格和目标网格列表。")
 
-    if not cmds.objExists(base_mesh):
-        return {"success": False, "message": "基础网格 '{}' 不存在。".format(base_mesh)}
-
-    missing = [t for t in target_meshes if not cmds.objExists(t)]
+    # Base and targets are validated together in a single ls
+    missing = missing_nodes([base_mesh] + list(target_meshes))
+    if missing and missing[0] == base_mesh:
+        return _fail(f"基础网格 '{base_mesh}' 不存在。")
     if missing:
-        return {"success": False, "message": "目标网格不存在: {}".format(", ".join(missing))}
+        return _fail(f"目标网格不存在: {', '.join(missing)}")
 
     try:
         args = target_meshes + [base_mesh]
@@ -427,13 +509,10 @@ def add_blendshape(base_mesh="", target_meshes=None, name=None):
             kwargs["name"] = name
 
         bs_node = cmds.blendShape(*args, **kwargs)
-        return {
-            "success": True,
-            "message": "已创建 BlendShape: {} (目标: {})".format(
-                bs_node[0], ", ".join(target_meshes)),
-        }
+        return _ok(
+            f"已创建 BlendShape: {bs_node[0]} (目标: {_short_list(target_meshes)})")
     except Exception as e:
-        return {"success": False, "message": "创建 BlendShape 失败: {}".format(str(e))}
+        return _fail(f"创建 BlendShape 失败: {e}")
 
 
 # ---------------------------------------------------------------------------
@@ -473,18 +552,19 @@ def orient_joints(joints=None, primary_axis="xyz", secondary_axis="yup"):
     if not joints:
         joints = cmds.ls(selection=True, type="joint") or []
     if not joints:
-        return {"success": False, "message": "未指定骨骼，也没有选中任何骨骼。"}
+        return _fail("未指定骨骼，也没有选中任何骨骼。")
+
+    # One ls drops missing names (and non-joints) instead of objExists per joint
+    valid = cmds.ls(joints, type="joint") or []
 
     try:
-        for jnt in joints:
-            if not cmds.objExists(jnt):
-                continue
-            cmds.joint(jnt, edit=True, orientJoint=primary_axis,
-                       secondaryAxisOrient=secondary_axis)
-
-        return {
-            "success": True,
-            "message": "已重定向 {} 个骨骼的 Joint Orient。".format(len(joints)),
-        }
+        # joint -edit works on a single joint per call, so the loop stays;
+        # evaluation and redraw are paused until the whole set is oriented
+        with _fast_scene():
+            for jnt in valid:
+                cmds.joint(jnt, edit=True, orientJoint=primary_axis,
+                           secondaryAxisOrient=secondary_axis)
+
+        return _ok(f"已重定向 {len(joints)} 个骨骼的 Joint Orient。")
     except Exception as e:
-        return {"success": False, "message": "骨骼定向失败: {}".format(str(e))}
+        return _fail(f"骨骼定向失败: {e}")
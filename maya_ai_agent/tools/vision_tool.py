@@ -10,15 +10,28 @@ Enhanced with scene metadata collection to help cross-validate visual
 observations against actual scene data, reducing hallucination.
 """
 
+import bisect
+import re
 import traceback
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; pure-Python fallback below
+    np = None
+
 from ..tool_registry import tool
-from ..viewport_capture import capture_viewport
+from ..viewport_capture import capture_viewport, get_active_viewport, to_data_uri
 from ..logger import log
 
 
-# Module-level storage for the latest captured image.
-# This is read by prompt_builder to inject into the next LLM request.
+# Module-level storage for the latest captured image (raw bytes) and its
+# MIME type. This is read by prompt_builder to inject into the next LLM
+# request; it is only base64-encoded then, so an image that is never sent
+# is never encoded.
 _pending_viewport_image = None
+_pending_viewport_mime = "image/png"
 
 # Module-level storage for scene metadata collected at capture time.
 # This is injected alongside the image to help the LLM cross-validate.
@@ -29,12 +42,14 @@ def get_pending_image():
     """Retrieve and clear the pending viewport image.
 
     Returns:
-        str or None: base64-encoded PNG data URI, or None if no image pending.
+        str or None: base64-encoded image data URI, or None if no image pending.
     """
     global _pending_viewport_image
     img = _pending_viewport_image
     _pending_viewport_image = None
-    return img
+    if img is None:
+        return None
+    return to_data_uri(img, _pending_viewport_mime)
 
 
 def get_pending_scene_metadata():
@@ -54,150 +69,397 @@ def has_pending_image():
     return _pending_viewport_image is not None
 
 
-def _analyze_body_completeness(cmds):
+# Geometry sections of the metadata report, reused while the scene is
+# unchanged: (_geometry_token() it was built under, (lines, conclusions)).
+# Written by the analysis worker as one tuple so readers never see a mix.
+_geometry_cache = (None, None)
+
+# Runs the pure-Python/numpy part of the scene analysis. maya.cmds is not
+# thread-safe, so every Maya query stays on the main thread and only the
+# already-gathered data is handed to this worker.
+_analysis_executor = ThreadPoolExecutor(max_workers=1)
+
+# How long the capture tool waits for the analysis worker
+_ANALYSIS_TIMEOUT = 30.0
+
+# Bumped by Maya callbacks and by other agent tools whenever the scene may
+# have changed in a way the cheap token checks below cannot see.
+_scene_generation = 0
+_scene_callbacks_installed = False
+
+# Vertex Ys of the body meshes last read, keyed by long shape name:
+# {shape: ((vertex count, world bbox), ys)}. A mesh whose signature still
+# matches skips the getPoints call even when the rest of the report is
+# rebuilt. Cleared when a scene is opened or created.
+_body_points_cache = {}
+
+
+def _bump_scene_generation(*_args):
+    global _scene_generation
+    _scene_generation += 1
+
+
+def _on_scene_reset(*_args):
+    """A different scene was loaded: nothing cached refers to it any more."""
+    _body_points_cache.clear()
+    _bump_scene_generation()
+
+
+def invalidate_scene_metadata():
+    """Mark the cached scene metadata as stale.
+
+    Called by ActionExecutor after every other tool, since tools edit the
+    scene without firing the callbacks installed here.
+    """
+    _bump_scene_generation()
+
+
+def _install_scene_callbacks():
+    """Register (once) the Maya callbacks that invalidate the metadata cache."""
+    global _scene_callbacks_installed
+    if _scene_callbacks_installed:
+        return
+    _scene_callbacks_installed = True
+
+    import maya.api.OpenMaya as om2
+
+    for msg in (om2.MSceneMessage.kAfterOpen, om2.MSceneMessage.kAfterNew):
+        om2.MSceneMessage.addCallback(msg, _on_scene_reset)
+    for msg in (om2.MSceneMessage.kAfterImport,
+                om2.MSceneMessage.kAfterCreateReference,
+                om2.MSceneMessage.kAfterRemoveReference):
+        om2.MSceneMessage.addCallback(msg, _bump_scene_generation)
+
+    # Interactive edits: undo/redo, new or renamed nodes, manipulator drags
+    for event in ("Undo", "Redo", "DagObjectCreated", "NameChanged", "DragRelease"):
+        try:
+            om2.MEventMessage.addEventCallback(event, _bump_scene_generation)
+        except RuntimeError:
+            log.debug("Scene event not available: %s", event)
+    om2.MDGMessage.addNodeRemovedCallback(_bump_scene_generation, "dagNode")
+
+
+def _geometry_token(cmds):
+    """Cheap fingerprint of the scene state the geometry report depends on.
+
+    The last undoable command catches edits no callback reports (e.g. a
+    value typed into the Channel Box).
+    """
+    return (
+        _scene_generation,
+        cmds.currentTime(query=True),
+        cmds.undoInfo(query=True, undoName=True),
+    )
+
+
+# One row of the visible-mesh report; bounding-box fields are (x, y, z) tuples
+MeshInfo = namedtuple("MeshInfo", "name vertices faces bb_min bb_max bb_size")
+
+# Name keywords (case-insensitive) of meshes worth a body-completeness check
+_BODY_MESH_RE = re.compile(
+    r"body|character|human|avatar|figure|skm_|sk_|mesh", re.IGNORECASE)
+
+_HEAD_JOINT_RE = re.compile(r"head", re.IGNORECASE)
+_NECK_JOINT_RE = re.compile(r"neck", re.IGNORECASE)
+
+# Most body meshes read per capture; extra matches add little to the report
+_MAX_BODY_MESHES = 3
+
+# Body regions from the bottom up, in the order _region_counts returns them
+_REGIONS = ("feet", "legs", "torso", "upper_torso", "neck", "head")
+
+# Report labels for _REGIONS
+_REGION_CN = {
+    "head": "头部(顶部12%)",
+    "neck": "颈部(82-88%)",
+    "upper_torso": "上胸(75-82%)",
+    "torso": "躯干(45-75%)",
+    "legs": "腿部(5-45%)",
+    "feet": "脚部(底部5%)",
+}
+
+
+def _world_ys(mesh):
+    """Return the world-space Y of every vertex of a mesh shape.
+
+    One MFnMesh.getPoints call replaces a cmds.pointPosition per vertex.
+    With numpy the Ys go straight from the MPointArray into a float64
+    array, without an intermediate Python list.
+    """
+    import maya.api.OpenMaya as om2
+
+    sel_list = om2.MSelectionList()
+    sel_list.add(mesh)
+    mesh_fn = om2.MFnMesh(sel_list.getDagPath(0))
+    points = mesh_fn.getPoints(om2.MSpace.kWorld)
+    if np is not None:
+        return np.fromiter((p.y for p in points), dtype=np.float64,
+                           count=len(points))
+    return [p.y for p in points]
+
+
+def _region_counts(ys, thresholds):
+    """Count Y values per region; `thresholds` are the ascending lower bounds
+    of every region above "feet". Returns counts ordered like _REGIONS."""
+    if np is not None:
+        # Bucket index = number of thresholds <= y, i.e. the same y >= bound
+        # test as the pure-Python path, done in one native pass
+        # asarray is a no-op on the float64 arrays _world_ys returns
+        buckets = np.searchsorted(
+            np.asarray(thresholds, dtype=np.float64),
+            np.asarray(ys, dtype=np.float64), side="right")
+        return np.bincount(buckets, minlength=len(thresholds) + 1).tolist()
+    counts = [0] * (len(thresholds) + 1)
+    for y in ys:
+        counts[bisect.bisect_right(thresholds, y)] += 1
+    return counts
+
+
+def _visible_mesh_shapes(cmds):
+    """Return (shape, transform) long-name pairs for visible, non-intermediate meshes.
+
+    ls filters visibility and intermediate objects itself, and the parent
+    transform is the shape's long path minus its last component, so no
+    per-mesh getAttr or listRelatives is needed.
+    """
+    shapes = cmds.ls(type="mesh", long=True, visible=True, noIntermediate=True) or []
+    return [(shape, shape.rsplit("|", 1)[0]) for shape in shapes]
+
+
+def _gather_body_meshes(measured):
+    """Collect the Maya data the body-completeness analysis needs.
+
+    Main thread only. `measured` holds the (shape, short_name, vertex
+    count, world bbox) rows _gather_geometry() already queried, so no mesh
+    is listed or measured twice. Returns a list of (short_name, bb_ymin,
+    bb_ymax, ys) for up to _MAX_BODY_MESHES visible, human-scale meshes
+    with a body-like name.
+    """
+    global _body_points_cache
+    # Only analyze meshes that look like body/character meshes; a scene of
+    # props and environment geometry stops here without any Maya query
+    candidates = [row for row in measured if _BODY_MESH_RE.search(row[1])]
+    if not candidates:
+        return []
+
+    body_meshes = []
+    points_cache = {}
+    for mesh, short_name, verts, bb in candidates:
+        if len(body_meshes) >= _MAX_BODY_MESHES:
+            break
+        # bb = [xmin, ymin, zmin, xmax, ymax, zmax]
+        # Only analyze if it looks like a human-scale mesh (height > 50 units)
+        if bb[4] - bb[1] < 50:
+            continue
+
+        # Read all vertex positions in one API call, unless the mesh
+        # still has the vertex count and bounding box it was read with
+        signature = (verts, tuple(bb))
+        cached = _body_points_cache.get(mesh)
+        if cached is not None and cached[0] == signature:
+            ys = cached[1]
+        else:
+            try:
+                ys = _world_ys(mesh)
+            except Exception:
+                continue
+        points_cache[mesh] = (signature, ys)
+        body_meshes.append((short_name, bb[1], bb[4], ys))
+
+    # Only meshes still in the scene stay cached
+    _body_points_cache = points_cache
+    return body_meshes
+
+
+def _analyze_body_completeness(body_meshes):
     """Analyze whether a human body mesh has head, hands, feet, etc.
 
-    Uses vertex position sampling and bounding box analysis to determine
-    which body parts actually have geometry.
+    Uses vertex positions and bounding box analysis to determine
+    which body parts actually have geometry. Pure Python/numpy, so it can
+    run off the main thread on data from _gather_body_meshes().
 
     Returns:
-        list[str]: Lines of analysis results with definitive conclusions.
+        tuple: (report lines, conclusion lines). The conclusions are the
+        definitive statements, stripped, that the capture tool quotes back
+        to the LLM; they are tagged here rather than searched for later.
     """
     lines = []
-    all_meshes = cmds.ls(type="mesh", long=True) or []
+    conclusions = []
 
-    for mesh in all_meshes:
-        try:
-            transform = cmds.listRelatives(mesh, parent=True, fullPath=True)
-            if not transform:
-                continue
-            transform = transform[0]
-            vis = cmds.getAttr("{}.visibility".format(transform))
-            intermediate = cmds.getAttr("{}.intermediateObject".format(mesh))
-            if not vis or intermediate:
-                continue
+    def conclude(line):
+        lines.append(line)
+        conclusions.append(line.strip())
 
-            short_name = transform.rsplit("|", 1)[-1]
-            name_lower = short_name.lower()
-
-            # Only analyze meshes that look like body/character meshes
-            is_body_mesh = any(kw in name_lower for kw in [
-                "body", "character", "human", "avatar", "figure",
-                "skm_", "sk_", "mesh"
-            ])
-            if not is_body_mesh:
-                continue
+    for short_name, bb_ymin, bb_ymax, ys in body_meshes:
+        bb_height = bb_ymax - bb_ymin
 
-            bb = cmds.exactWorldBoundingBox(transform)
-            # bb = [xmin, ymin, zmin, xmax, ymax, zmax]
-            bb_height = bb[4] - bb[1]
-            bb_ymax = bb[4]
-            bb_ymin = bb[1]
+        lines.append(f"[身体完整性分析] 网格: {short_name}")
+        lines.append(
+            f"  包围盒高度: {bb_height:.1f}  Y范围: [{bb_ymin:.1f}, {bb_ymax:.1f}]")
 
-            # Only analyze if it looks like a human-scale mesh (height > 50 units)
-            if bb_height < 50:
-                continue
+        if len(ys) == 0:
+            lines.append("  结论: 网格没有顶点")
+            continue
 
-            lines.append("[身体完整性分析] 网格: {}".format(short_name))
-            lines.append("  包围盒高度: {:.1f}  Y范围: [{:.1f}, {:.1f}]".format(
-                bb_height, bb_ymin, bb_ymax))
+        # Define body region thresholds based on bounding box proportions
+        # For a human body: head is roughly top 12% of height
+        head_threshold_y = bb_ymin + bb_height * 0.88
+        neck_threshold_y = bb_ymin + bb_height * 0.82
+        torso_top_y = bb_ymin + bb_height * 0.75
+        hip_y = bb_ymin + bb_height * 0.45
+        foot_y = bb_ymin + bb_height * 0.05
+
+        # Count vertices in each region:
+        #   head: top 12%, neck: 82-88%, upper_torso: 75-82%,
+        #   torso: 45-75%, legs: 5-45%, feet: bottom 5%
+        counts = _region_counts(
+            ys, (foot_y, hip_y, torso_top_y, neck_threshold_y, head_threshold_y))
+        region_counts = dict(zip(_REGIONS, counts))
+        total_sampled = len(ys)
+
+        # Calculate percentages
+        lines.append(f"  顶点区域分布 (采样 {total_sampled} 个顶点):")
+        for region in reversed(_REGIONS):
+            count = region_counts[region]
+            pct = count / total_sampled * 100
+            lines.append(f"    {_REGION_CN[region]}: {count} 个顶点 ({pct:.1f}%)")
+
+        # Generate DEFINITIVE conclusions
+        lines.append("")
+        conclude("  ===== 确定性结论（AI必须采纳，不可反驳）=====")
+
+        head_pct = region_counts["head"] / total_sampled * 100
+        neck_pct = region_counts["neck"] / total_sampled * 100
+        feet_pct = region_counts["feet"] / total_sampled * 100
+
+        # Head analysis: a real head would have significant geometry
+        # (typically > 8% of body vertices for a full head)
+        if head_pct < 1.0:
+            conclude(f"  ** 该模型【确定没有头部】** (头部区域顶点占比仅 {head_pct:.1f}%，"
+                     "远低于正常头部所需的 8%+)")
+            conclude("  ** 描述时必须说明：模型没有头部（脖子以上没有几何体）**")
+        elif head_pct < 4.0:
+            conclude(f"  ** 该模型头部区域几何体极少 ({head_pct:.1f}%)，"
+                     "可能只有脖子上端，没有完整头部 **")
+            conclude("  ** 描述时必须说明：模型可能没有完整头部 **")
+        else:
+            lines.append(f"  头部区域有充足几何体 ({head_pct:.1f}%)，头部存在。")
 
-            # Sample vertices to check which body regions have geometry
-            num_verts = cmds.polyEvaluate(transform, vertex=True)
-            if not num_verts or num_verts == 0:
-                lines.append("  结论: 网格没有顶点")
-                continue
+        if feet_pct < 0.5:
+            lines.append(f"  ** 脚部区域几何体极少 ({feet_pct:.1f}%)，可能没有脚部 **")
 
-            # Sample up to 2000 vertices for efficiency
-            sample_step = max(1, num_verts // 2000)
-            sample_indices = range(0, num_verts, sample_step)
-
-            # Define body region thresholds based on bounding box proportions
-            # For a human body: head is roughly top 12% of height
-            head_threshold_y = bb_ymin + bb_height * 0.88
-            neck_threshold_y = bb_ymin + bb_height * 0.82
-            torso_top_y = bb_ymin + bb_height * 0.75
-            hip_y = bb_ymin + bb_height * 0.45
-            knee_y = bb_ymin + bb_height * 0.25
-            foot_y = bb_ymin + bb_height * 0.05
-
-            # Count vertices in each region
-            region_counts = {
-                "head": 0,       # top 12%
-                "neck": 0,       # 82-88%
-                "upper_torso": 0, # 75-82%
-                "torso": 0,      # 45-75%
-                "legs": 0,       # 5-45%
-                "feet": 0,       # bottom 5%
-            }
-            total_sampled = 0
-
-            for vi in sample_indices:
-                try:
-                    pos = cmds.pointPosition("{}.vtx[{}]".format(transform, vi), world=True)
-                    y = pos[1]
-                    total_sampled += 1
-                    if y >= head_threshold_y:
-                        region_counts["head"] += 1
-                    elif y >= neck_threshold_y:
-                        region_counts["neck"] += 1
-                    elif y >= torso_top_y:
-                        region_counts["upper_torso"] += 1
-                    elif y >= hip_y:
-                        region_counts["torso"] += 1
-                    elif y >= foot_y:
-                        region_counts["legs"] += 1
-                    else:
-                        region_counts["feet"] += 1
-                except Exception:
-                    continue
-
-            if total_sampled == 0:
-                continue
+    return lines, conclusions
+
+
+def _gather_geometry(cmds):
+    """Query Maya for the mesh, body-completeness and skeleton sections.
 
-            # Calculate percentages
-            lines.append("  顶点区域分布 (采样 {} 个顶点):".format(total_sampled))
-            for region, count in region_counts.items():
-                pct = count / total_sampled * 100
-                region_cn = {
-                    "head": "头部(顶部12%)",
-                    "neck": "颈部(82-88%)",
-                    "upper_torso": "上胸(75-82%)",
-                    "torso": "躯干(45-75%)",
-                    "legs": "腿部(5-45%)",
-                    "feet": "脚部(底部5%)",
-                }
-                lines.append("    {}: {} 个顶点 ({:.1f}%)".format(
-                    region_cn.get(region, region), count, pct))
-
-            # Generate DEFINITIVE conclusions
-            lines.append("")
-            lines.append("  ===== 确定性结论（AI必须采纳，不可反驳）=====")
-
-            head_pct = region_counts["head"] / total_sampled * 100
-            neck_pct = region_counts["neck"] / total_sampled * 100
-            feet_pct = region_counts["feet"] / total_sampled * 100
-
-            # Head analysis: a real head would have significant geometry
-            # (typically > 8% of body vertices for a full head)
-            if head_pct < 1.0:
-                lines.append("  ** 该模型【确定没有头部】** (头部区域顶点占比仅 {:.1f}%，"
-                             "远低于正常头部所需的 8%+)".format(head_pct))
-                lines.append("  ** 描述时必须说明：模型没有头部（脖子以上没有几何体）**")
-            elif head_pct < 4.0:
-                lines.append("  ** 该模型头部区域几何体极少 ({:.1f}%)，"
-                             "可能只有脖子上端，没有完整头部 **".format(head_pct))
-                lines.append("  ** 描述时必须说明：模型可能没有完整头部 **")
-            else:
-                lines.append("  头部区域有充足几何体 ({:.1f}%)，头部存在。".format(head_pct))
-
-            if feet_pct < 0.5:
-                lines.append("  ** 脚部区域几何体极少 ({:.1f}%)，可能没有脚部 **".format(feet_pct))
+    Main thread only. The body analysis itself is left to
+    _build_geometry_lines() so it can run on the worker.
+
+    Returns:
+        tuple: (mesh lines, body meshes, skeleton lines).
+    """
+    lines = []
 
+    # All visible mesh objects with detailed info, listed once and shared
+    # with the body analysis along with their world bounding boxes
+    visible_meshes = []
+    measured = []
+    for mesh, transform in _visible_mesh_shapes(cmds):
+        try:
+            short_name = transform.rsplit("|", 1)[-1]
+            # polyEvaluate returns a dict when given several flags
+            counts = cmds.polyEvaluate(transform, vertex=True, face=True)
+            verts = counts["vertex"]
+            faces = counts["face"]
+            bb = cmds.exactWorldBoundingBox(transform)
+            measured.append((mesh, short_name, verts, bb))
+            bb_size = (bb[3] - bb[0], bb[4] - bb[1], bb[5] - bb[2])
+            visible_meshes.append(MeshInfo(
+                short_name, verts, faces,
+                (round(bb[0], 1), round(bb[1], 1), round(bb[2], 1)),
+                (round(bb[3], 1), round(bb[4], 1), round(bb[5], 1)),
+                tuple(round(s, 1) for s in bb_size),
+            ))
         except Exception:
             continue
 
-    return lines
+    if visible_meshes:
+        lines.append(f"[可见网格对象] (共 {len(visible_meshes)} 个)")
+        for m in visible_meshes[:20]:
+            (min_x, min_y, min_z), (max_x, max_y, max_z), (sx, sy, sz) = (
+                m.bb_min, m.bb_max, m.bb_size)
+            lines.append(f"  - {m.name} (顶点:{m.vertices}, 面:{m.faces})")
+            lines.append(f"    包围盒: min=[{min_x}, {min_y}, {min_z}] "
+                         f"max=[{max_x}, {max_y}, {max_z}] 尺寸=[{sx}, {sy}, {sz}]")
+
+    # Vertex data for the body completeness analysis
+    body_meshes = _gather_body_meshes(measured)
+
+    # Joint/skeleton info
+    joint_lines = []
+    joint_paths = cmds.ls(type="joint", long=True) or []
+    if joint_paths:
+        joint_lines.append(f"[骨骼系统] 共 {len(joint_paths)} 个骨骼")
+        # A root joint's parent path is not itself a joint; only the first
+        # five are reported, so stop looking once they are found
+        joint_set = set(joint_paths)
+        root_joints = []
+        for path in joint_paths:
+            parent, _, name = path.rpartition("|")
+            if parent not in joint_set:
+                root_joints.append(name)
+                if len(root_joints) == 5:
+                    break
+        if root_joints:
+            joint_lines.append(f"  根骨骼: {', '.join(root_joints)}")
+
+        # Check if head-related joints exist but no head mesh
+        all_joints = [path.rpartition("|")[2] for path in joint_paths]
+        head_joints = [j for j in all_joints if _HEAD_JOINT_RE.search(j)]
+        neck_joints = [j for j in all_joints if _NECK_JOINT_RE.search(j)]
+        if head_joints or neck_joints:
+            joint_lines.append(
+                f"  头部/颈部相关骨骼: {', '.join((head_joints + neck_joints)[:10])}")
+            joint_lines.append("  注意: 即使存在头部骨骼，也不代表有头部网格。"
+                               "骨骼是绑定结构，网格才是可见几何体。")
+
+    return lines, body_meshes, joint_lines
+
+
+def _build_geometry(token, mesh_lines, body_meshes, joint_lines):
+    """Run the body analysis and assemble the geometry sections (worker thread).
+
+    The (lines, conclusions) result is cached under `token` for later captures.
+    """
+    global _geometry_cache
+    body_lines, conclusions = _analyze_body_completeness(body_meshes)
+    geometry = (mesh_lines + body_lines + joint_lines, conclusions)
+    _geometry_cache = (token, geometry)
+    return geometry
+
+
+def _build_report(head_lines, tail_lines, geometry=None, geometry_args=None):
+    """Join the report sections (worker thread).
+
+    `geometry` is a cached (lines, conclusions) pair; when it is None it is
+    built from `geometry_args` first.
+
+    Returns:
+        tuple: (report text, conclusion lines).
+    """
+    if geometry is None:
+        geometry = _build_geometry(*geometry_args)
+    lines, conclusions = geometry
+    return "\n".join(head_lines + lines + tail_lines), conclusions
+
+
+def _done_future(value):
+    """Wrap an already-known result in a completed Future."""
+    future = Future()
+    future.set_result(value)
+    return future
 
 
 def _collect_scene_metadata():
@@ -207,8 +469,11 @@ def _collect_scene_metadata():
     such as which body parts exist as separate meshes, bounding box dimensions,
     visibility states, etc. Includes definitive geometric analysis conclusions.
 
+    Maya is queried here, on the main thread; the analysis and formatting
+    continue on a worker thread. Use _wait_for_metadata() for the text.
+
     Returns:
-        str: Formatted metadata text.
+        Future: Resolves to (formatted metadata text, conclusion lines).
     """
     try:
         import maya.cmds as cmds
@@ -226,11 +491,11 @@ def _collect_scene_metadata():
                 show_joints = cmds.modelEditor(panel, query=True, joints=True)
                 show_nurbs_curves = cmds.modelEditor(panel, query=True, nurbsCurves=True)
                 lines.append("[视口显示模式]")
-                lines.append("  显示模式: {}".format(display_mode))
-                lines.append("  线框叠加: {}".format("是" if wireframe_on else "否"))
-                lines.append("  X光模式: {}".format("是" if xray else "否"))
-                lines.append("  显示骨骼: {}".format("是" if show_joints else "否"))
-                lines.append("  显示曲线: {}".format("是" if show_nurbs_curves else "否"))
+                lines.append(f"  显示模式: {display_mode}")
+                lines.append(f"  线框叠加: {'是' if wireframe_on else '否'}")
+                lines.append(f"  X光模式: {'是' if xray else '否'}")
+                lines.append(f"  显示骨骼: {'是' if show_joints else '否'}")
+                lines.append(f"  显示曲线: {'是' if show_nurbs_curves else '否'}")
         except Exception:
             pass
 
@@ -241,81 +506,82 @@ def _collect_scene_metadata():
                 camera = cmds.modelPanel(panel, query=True, camera=True)
                 cam_pos = cmds.xform(camera, query=True, worldSpace=True, translation=True)
                 lines.append("[摄像机]")
-                lines.append("  摄像机: {}  位置: [{:.1f}, {:.1f}, {:.1f}]".format(
-                    camera, cam_pos[0], cam_pos[1], cam_pos[2]))
+                lines.append(f"  摄像机: {camera}  位置: "
+                             f"[{cam_pos[0]:.1f}, {cam_pos[1]:.1f}, {cam_pos[2]:.1f}]")
         except Exception:
             pass
 
-        # All visible mesh objects with detailed info
-        all_meshes = cmds.ls(type="mesh", long=True) or []
-        visible_meshes = []
-        for mesh in all_meshes:
-            try:
-                transform = cmds.listRelatives(mesh, parent=True, fullPath=True)
-                if not transform:
-                    continue
-                transform = transform[0]
-                vis = cmds.getAttr("{}.visibility".format(transform))
-                intermediate = cmds.getAttr("{}.intermediateObject".format(mesh))
-                if vis and not intermediate:
-                    short_name = transform.rsplit("|", 1)[-1]
-                    verts = cmds.polyEvaluate(transform, vertex=True)
-                    faces = cmds.polyEvaluate(transform, face=True)
-                    bb = cmds.exactWorldBoundingBox(transform)
-                    bb_size = [bb[3] - bb[0], bb[4] - bb[1], bb[5] - bb[2]]
-                    visible_meshes.append({
-                        "name": short_name,
-                        "vertices": verts,
-                        "faces": faces,
-                        "bb_min": [round(bb[0], 1), round(bb[1], 1), round(bb[2], 1)],
-                        "bb_max": [round(bb[3], 1), round(bb[4], 1), round(bb[5], 1)],
-                        "bb_size": [round(s, 1) for s in bb_size],
-                    })
-            except Exception:
-                continue
-
-        if visible_meshes:
-            lines.append("[可见网格对象] (共 {} 个)".format(len(visible_meshes)))
-            for m in visible_meshes[:20]:
-                lines.append("  - {} (顶点:{}, 面:{})".format(
-                    m["name"], m["vertices"], m["faces"]))
-                lines.append("    包围盒: min={} max={} 尺寸={}".format(
-                    m["bb_min"], m["bb_max"], m["bb_size"]))
-
-        # Perform body completeness analysis
-        body_analysis = _analyze_body_completeness(cmds)
-        if body_analysis:
-            lines.extend(body_analysis)
-
-        # Joint/skeleton info
-        all_joints = cmds.ls(type="joint") or []
-        if all_joints:
-            lines.append("[骨骼系统] 共 {} 个骨骼".format(len(all_joints)))
-            root_joints = [j for j in all_joints if not cmds.listRelatives(j, parent=True, type="joint")]
-            if root_joints:
-                lines.append("  根骨骼: {}".format(", ".join(root_joints[:5])))
-
-            # Check if head-related joints exist but no head mesh
-            head_joints = [j for j in all_joints if "head" in j.lower()]
-            neck_joints = [j for j in all_joints if "neck" in j.lower()]
-            if head_joints or neck_joints:
-                lines.append("  头部/颈部相关骨骼: {}".format(
-                    ", ".join((head_joints + neck_joints)[:10])))
-                lines.append("  注意: 即使存在头部骨骼，也不代表有头部网格。"
-                             "骨骼是绑定结构，网格才是可见几何体。")
+        # Mesh, body and skeleton sections only change with the scene itself
+        _install_scene_callbacks()
+        token = _geometry_token(cmds)
+        cached_token, geometry = _geometry_cache
+        geometry_args = None
+        if cached_token != token:
+            geometry = None
+            geometry_args = (token,) + _gather_geometry(cmds)
 
         # Selected objects
+        tail_lines = []
         sel = cmds.ls(selection=True) or []
         if sel:
-            lines.append("[当前选择] {}".format(", ".join(sel[:10])))
+            tail_lines.append(f"[当前选择] {', '.join(sel[:10])}")
         else:
-            lines.append("[当前选择] 无")
+            tail_lines.append("[当前选择] 无")
 
-        return "\n".join(lines)
+        return _analysis_executor.submit(
+            _build_report, lines, tail_lines, geometry, geometry_args)
 
     except Exception:
         log.warning("Failed to collect scene metadata: %s", traceback.format_exc())
-        return "(场景元数据收集失败)"
+        return _done_future(("(场景元数据收集失败)", []))
+
+
+def _wait_for_metadata(future):
+    """Block until the metadata worker is done.
+
+    Returns:
+        tuple: (metadata text, conclusion lines).
+    """
+    try:
+        return future.result(timeout=_ANALYSIS_TIMEOUT)
+    except Exception:
+        log.warning("Failed to collect scene metadata: %s", traceback.format_exc())
+        return "(场景元数据收集失败)", []
+
+
+# Longest image side per capture quality tier; None keeps the requested size.
+# Vision models read scene layout fine at 512-768 px, and a smaller playblast
+# is cheaper to render, encode and upload.
+_QUALITY_MAX_SIDE = {"low": 512, "medium": 768, "high": None}
+
+
+def _fit_resolution(width, height, quality):
+    """Scale (width, height) down, keeping the aspect ratio, to fit a quality tier."""
+    max_side = _QUALITY_MAX_SIDE.get(quality)
+    longest = max(width, height)
+    if max_side is None or longest <= max_side:
+        return width, height
+    scale = max_side / longest
+    return int(round(width * scale)), int(round(height * scale))
+
+
+def _capture_format():
+    """Pick the playblast image format for the active viewport.
+
+    Shaded views compress several times smaller as JPEG with no loss that
+    matters to a vision model; wireframe is thin line art, where JPEG
+    artifacts do show, so it stays PNG.
+    """
+    import maya.cmds as cmds
+
+    try:
+        panel = get_active_viewport()
+        if panel and cmds.modelEditor(
+                panel, query=True, displayAppearance=True) == "wireframe":
+            return "png"
+    except Exception:
+        pass
+    return "jpg"
 
 
 @tool(
@@ -340,11 +606,20 @@ def _collect_scene_metadata():
                 "type": "integer",
                 "description": "截图高度(像素)，默认720。",
             },
+            "quality": {
+                "type": "string",
+                "enum": ["low", "medium", "high"],
+                "description": (
+                    "截图质量档位: low(最长边512), medium(最长边768), "
+                    "high(按 width/height 原尺寸，默认)。"
+                    "只需判断场景布局时用 low/medium，图片更小、上传更快。"
+                ),
+            },
         },
         "required": [],
     },
 )
-def capture_viewport_tool(width=1280, height=720):
+def capture_viewport_tool(width=1280, height=720, quality="high"):
     """Capture the Maya viewport and store the image for the next LLM request.
 
     The image is NOT returned as text to the LLM directly (base64 is too long).
@@ -358,42 +633,44 @@ def capture_viewport_tool(width=1280, height=720):
         dict: Success status and a brief description for the LLM.
     """
     global _pending_viewport_image
+    global _pending_viewport_mime
     global _pending_scene_metadata
 
-    result = capture_viewport(width=width, height=height)
+    # Query the scene first: its analysis then runs on the worker thread
+    # while the main thread is busy with the playblast.
+    metadata_future = _collect_scene_metadata()
+
+    # Render at the tier's size directly rather than resizing afterwards
+    width, height = _fit_resolution(width, height, quality)
+    result = capture_viewport(width=width, height=height,
+                              image_format=_capture_format())
 
     if not result["success"]:
         _pending_scene_metadata = None
         return {
             "success": False,
-            "message": "视口截图失败: {}".format(result.get("error", "unknown")),
+            "message": f"视口截图失败: {result.get('error', 'unknown')}",
         }
 
-    # Store as data URI for the vision API
-    _pending_viewport_image = "data:image/png;base64," + result["image_base64"]
+    # Keep the raw bytes; get_pending_image() builds the data URI on demand
+    _pending_viewport_image = result["image_bytes"]
+    _pending_viewport_mime = result["mime_type"]
 
     # Collect scene metadata for cross-validation
-    _pending_scene_metadata = _collect_scene_metadata()
-
-    # Extract key conclusions from metadata to include in tool response
-    conclusions = ""
-    if _pending_scene_metadata:
-        meta_lines = _pending_scene_metadata.split("\n")
-        conclusion_lines = [l for l in meta_lines if "确定没有" in l or "确定性结论" in l
-                           or "必须说明" in l or "没有完整" in l]
-        if conclusion_lines:
-            conclusions = (
-                "\n\n【几何分析关键结论】\n" +
-                "\n".join(l.strip() for l in conclusion_lines) +
-                "\n你在回答中必须采纳以上结论。"
-            )
-
-    return {
-        "success": True,
-        "message": (
-            "已成功截取视口画面 ({}x{})。"
-            "图片将在下一条消息中以视觉内容发送给你。"
-            "系统已完成精确几何分析，分析报告将一并注入。"
-            "你必须优先采纳几何分析的结论，不可自行推翻。{}"
-        ).format(result["width"], result["height"], conclusions),
-    }
+    _pending_scene_metadata, conclusion_lines = _wait_for_metadata(metadata_future)
+
+    message = (
+        f"已成功截取视口画面 ({result['width']}x{result['height']})。"
+        "图片将在下一条消息中以视觉内容发送给你。"
+        "系统已完成精确几何分析，分析报告将一并注入。"
+        "你必须优先采纳几何分析的结论，不可自行推翻。"
+    )
+
+    # Key conclusions (tagged, already stripped, during the analysis) go
+    # into the tool response
+    if conclusion_lines:
+        conclusions = "\n".join(conclusion_lines)
+        message = (f"{message}\n\n【几何分析关键结论】\n{conclusions}"
+                   "\n你在回答中必须采纳以上结论。")
+
+    return {"success": True, "message": message}
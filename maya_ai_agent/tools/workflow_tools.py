@@ -10,9 +10,86 @@ Includes:
 """
 
 import re
+from collections import Counter
+
+import maya.api.OpenMaya as om2
 import maya.cmds as cmds
 
 from ..tool_registry import tool
+from .maya_tools import _fast_scene
+
+
+# Short names qa_check_transforms treats as controllers
+_CTRL_NAME_RE = re.compile(r"ctrl|controller|con$|_ctl$|_cc$", re.IGNORECASE)
+
+# Joint suffix dropped when naming a joint's controller
+_JOINT_SUFFIX_RE = re.compile(r"_?(?:jnt|joint)$", re.IGNORECASE)
+
+# Channel names qa_check_transforms reports, in _local_trs() axis order
+_TRANSLATE_ATTRS = ("translateX", "translateY", "translateZ")
+_ROTATE_ATTRS = ("rotateX", "rotateY", "rotateZ")
+_SCALE_ATTRS = ("scaleX", "scaleY", "scaleZ")
+
+
+def _local_trs(obj):
+    """Read an object's local translate, rotate and scale in one API pass.
+
+    Returns three (x, y, z) tuples in UI units, matching what getAttr on
+    .translateX etc. reports, or None if obj is not an existing transform.
+    """
+    try:
+        sel_list = om2.MSelectionList()
+        sel_list.add(obj)
+        xform = om2.MFnTransform(sel_list.getDagPath(0))
+    except (RuntimeError, TypeError):
+        return None
+    t = xform.translation(om2.MSpace.kTransform)
+    r = xform.rotation()
+    translate = tuple(om2.MDistance.internalToUI(v) for v in (t.x, t.y, t.z))
+    rotate = tuple(om2.MAngle.internalToUI(v) for v in (r.x, r.y, r.z))
+    return translate, rotate, tuple(xform.scale())
+
+
+def _resolve_rename_targets(names):
+    """Map explicitly given names to unique long paths for batch_rename.
+
+    One ls canonicalises every name, but ls also expands wildcards and
+    ambiguous short names into several nodes; renaming those silently would
+    hit nodes the caller never named. Such names are rejected instead.
+    Missing names are dropped, as before.
+
+    Returns:
+        tuple: (long paths, error lines for rejected names).
+    """
+    errors = []
+    plain = []
+    for name in dict.fromkeys(names):
+        if "*" in name or "?" in name:
+            errors.append(f"{name}: 错误 - 不支持通配符，请给出完整名称")
+        else:
+            plain.append(name)
+    if not plain:
+        return [], errors
+
+    # With distinct leaf names among the inputs, every name resolved to
+    # exactly one node when each leaf appears exactly once in the result.
+    # A repeated leaf (e.g. "a" and "|grp1|a") can't be attributed to one
+    # input, so it always goes through the per-name check below.
+    leaves = Counter(n.rsplit("|", 1)[-1] for n in plain)
+    if len(leaves) == len(plain):
+        paths = cmds.ls(plain, long=True) or []
+        if Counter(p.rsplit("|", 1)[-1] for p in paths) == leaves:
+            return paths, errors
+
+    # Missing or ambiguous names: resolve name by name to find out which
+    paths = []
+    for name in plain:
+        matches = cmds.ls(name, long=True) or []
+        if len(matches) > 1:
+            errors.append(f"{name}: 错误 - 名称不唯一，匹配到 {len(matches)} 个物体，请使用完整路径")
+        else:
+            paths.extend(matches)
+    return list(dict.fromkeys(paths)), errors
 
 
 # ---------------------------------------------------------------------------
@@ -70,9 +147,16 @@ from ..tool_registry import tool
 def batch_rename(objects=None, pattern=None, search=None, replace=None,
                  prefix=None, suffix=None, start_index=1):
     """Batch rename objects by pattern, search/replace, or prefix/suffix."""
+    rejected = []
     if not objects:
         objects = cmds.ls(selection=True, long=True) or []
+    else:
+        # ls drops missing names and maps every spelling of a node to its
+        # long path, so duplicates collapse and no objExists is needed
+        objects, rejected = _resolve_rename_targets(objects)
     if not objects:
+        if rejected:
+            return {"success": False, "message": "\n".join(rejected)}
         return {"success": False, "message": "没有指定物体，也没有选中任何物体。"}
 
     if not pattern and not search and not prefix and not suffix:
@@ -81,24 +165,38 @@ def batch_rename(objects=None, pattern=None, search=None, replace=None,
             "message": "请至少指定 pattern、search/replace、prefix 或 suffix 中的一种重命名方式。",
         }
 
-    renamed = []
-    # Process from deepest path first to avoid invalidating parent paths
-    objects_sorted = sorted(objects, key=lambda x: x.count("|"), reverse=True)
+    format_name = None
+    if pattern:
+        # Try the template once before anything is renamed, so a broken
+        # pattern fails cleanly instead of after a partial rename
+        format_name = pattern.format_map
+        try:
+            format_name({"index": start_index, "name": objects[0].rsplit("|", 1)[-1]})
+        except (KeyError, IndexError, ValueError) as e:
+            return {
+                "success": False,
+                "message": "命名模板错误: {}".format(str(e)),
+            }
+
+    renamed = list(rejected)
+    # Process from deepest path first to avoid invalidating parent paths.
+    # Bucketing by depth counts each path once and keeps the original order
+    # within a depth, as the stable sort did.
+    by_depth = {}
+    for obj in objects:
+        by_depth.setdefault(obj.count("|"), []).append(obj)
+    objects_sorted = [
+        obj for depth in sorted(by_depth, reverse=True) for obj in by_depth[depth]
+    ]
 
     for i, obj in enumerate(objects_sorted):
-        if not cmds.objExists(obj):
-            continue
-
         short = obj.rsplit("|", 1)[-1]
         new_name = short
 
         if pattern:
             # Template-based rename
             try:
-                new_name = pattern.format(
-                    index=start_index + i,
-                    name=short,
-                )
+                new_name = format_name({"index": start_index + i, "name": short})
             except (KeyError, IndexError, ValueError) as e:
                 return {
                     "success": False,
@@ -118,11 +216,11 @@ def batch_rename(objects=None, pattern=None, search=None, replace=None,
         if new_name and new_name != short:
             try:
                 result_name = cmds.rename(obj, new_name)
-                renamed.append("{} → {}".format(short, result_name))
+                renamed.append(f"{short} → {result_name}")
             except Exception as e:
-                renamed.append("{}: 错误 - {}".format(short, str(e)))
+                renamed.append(f"{short}: 错误 - {e}")
         else:
-            renamed.append("{}: 名称未变".format(short))
+            renamed.append(f"{short}: 名称未变")
 
     return {
         "success": True,
@@ -178,6 +276,14 @@ def smart_select(name_pattern=None, node_type=None, parent=None,
     # Start with all DAG objects
     kwargs = {"dag": True, "long": True}
 
+    # A Maya wildcard is handed straight to ls wherever the candidates are
+    # the listed nodes themselves; only shape-derived transforms need the
+    # separate wildcard pass below.
+    wildcard = None
+    if name_pattern and not name_pattern.startswith("regex:"):
+        wildcard = name_pattern
+    wildcard_applied = False
+
     if node_type:
         # Handle special type aliases
         type_alias = {
@@ -188,37 +294,43 @@ def smart_select(name_pattern=None, node_type=None, parent=None,
         }
         actual_type = type_alias.get(node_type, node_type)
 
-        if node_type == "light":
-            candidates = cmds.ls(lights=True, long=True) or []
-            # Get their transforms
-            candidates = [
-                (cmds.listRelatives(c, parent=True, fullPath=True) or [None])[0]
-                for c in candidates
-            ]
-            candidates = [c for c in candidates if c]
-        else:
-            if actual_type in ("mesh", "nurbsCurve", "camera"):
-                shapes = cmds.ls(type=actual_type, long=True) or []
-                candidates = []
-                for s in shapes:
-                    parents = cmds.listRelatives(s, parent=True, fullPath=True) or []
-                    if parents:
-                        candidates.append(parents[0])
+        if node_type == "light" or actual_type in ("mesh", "nurbsCurve", "camera"):
+            if node_type == "light":
+                shapes = cmds.ls(lights=True, long=True) or []
             else:
-                candidates = cmds.ls(type=actual_type, long=True) or []
+                shapes = cmds.ls(type=actual_type, long=True) or []
+            # Their transforms, fetched for all shapes in one listRelatives
+            candidates = []
+            if shapes:
+                candidates = cmds.listRelatives(shapes, parent=True, fullPath=True) or []
+        elif wildcard:
+            candidates = cmds.ls(wildcard, type=actual_type, long=True) or []
+            wildcard_applied = True
+        else:
+            candidates = cmds.ls(type=actual_type, long=True) or []
+    elif wildcard:
+        # With names, ls reads dag=True as "below these nodes", so the DAG
+        # restriction is expressed as a type instead
+        candidates = cmds.ls(wildcard, type="dagNode", long=True) or []
+        wildcard_applied = True
     else:
         candidates = cmds.ls(dag=True, long=True) or []
 
-    # Filter by parent hierarchy
+    # Hierarchy filter: Maya lists every descendant's long path in one
+    # call, instead of a startswith test per candidate
+    descendants = None
     if parent:
         if not cmds.objExists(parent):
             return {"success": False, "message": "父物体 '{}' 不存在。".format(parent)}
         parent_long = cmds.ls(parent, long=True)
         if parent_long:
-            parent_path = parent_long[0]
-            candidates = [c for c in candidates if c.startswith(parent_path + "|")]
+            descendants = set(cmds.listRelatives(
+                parent_long[0], allDescendents=True, fullPath=True) or [])
 
-    # Filter by name pattern
+    # Name filter: a regex on the short name, or the ls matches of a Maya
+    # wildcard that could not be given to the initial ls
+    pattern_re = None
+    maya_matches = None
     if name_pattern:
         if name_pattern.startswith("regex:"):
             # Regex mode
@@ -227,23 +339,21 @@ def smart_select(name_pattern=None, node_type=None, parent=None,
                 pattern_re = re.compile(regex, re.IGNORECASE)
             except re.error as e:
                 return {"success": False, "message": "正则表达式错误: {}".format(str(e))}
-            candidates = [
-                c for c in candidates
-                if pattern_re.search(c.rsplit("|", 1)[-1])
-            ]
-        else:
-            # Maya wildcard mode — use cmds.ls with the pattern
+        elif not wildcard_applied:
             maya_matches = set(cmds.ls(name_pattern, long=True) or [])
-            candidates = [c for c in candidates if c in maya_matches]
 
-    # Remove duplicates while preserving order
-    seen = set()
-    unique = []
+    # Apply every filter in one pass; the dict also removes duplicates
+    # while preserving order
+    matched = {}
     for c in candidates:
-        if c not in seen:
-            seen.add(c)
-            unique.append(c)
-    candidates = unique
+        if descendants is not None and c not in descendants:
+            continue
+        if pattern_re is not None and not pattern_re.search(c.rsplit("|", 1)[-1]):
+            continue
+        if maya_matches is not None and c not in maya_matches:
+            continue
+        matched[c] = None
+    candidates = list(matched)
 
     if not candidates:
         return {"success": True, "message": "没有找到匹配的物体。", "selected_count": 0}
@@ -307,56 +417,49 @@ def qa_check_transforms(objects=None, tolerance=0.001,
                         check_translate=True, check_rotate=True,
                         check_scale=True):
     """QA check for non-default transforms on controllers."""
+    # (long name, short name) pairs; each short name is split off only once
     if not objects:
         # Auto-find controllers
-        all_transforms = cmds.ls(type="transform", long=True) or []
-        objects = [
-            t for t in all_transforms
-            if re.search(r'(?i)ctrl|controller|con$|_ctl$|_cc$', t.rsplit("|", 1)[-1])
-        ]
+        targets = []
+        for t in cmds.ls(type="transform", long=True) or []:
+            short = t.rsplit("|", 1)[-1]
+            if _CTRL_NAME_RE.search(short):
+                targets.append((t, short))
+    else:
+        targets = [(obj, obj.rsplit("|", 1)[-1]) for obj in objects]
 
-    if not objects:
+    if not targets:
         return {"success": True, "message": "未找到任何控制器/变换节点需要检查。"}
 
     issues = []
     clean_count = 0
 
-    for obj in objects:
-        if not cmds.objExists(obj):
+    for obj, short in targets:
+        # All nine channels come from one MFnTransform instead of nine getAttrs
+        trs = _local_trs(obj)
+        if trs is None:
             continue
+        translate, rotate, scale = trs
 
-        short = obj.rsplit("|", 1)[-1]
         obj_issues = []
 
         if check_translate:
-            for attr in ["translateX", "translateY", "translateZ"]:
-                try:
-                    val = cmds.getAttr("{}.{}".format(obj, attr))
-                    if abs(val) > tolerance:
-                        obj_issues.append("{} = {:.4f}".format(attr, val))
-                except Exception:
-                    pass
+            for attr, val in zip(_TRANSLATE_ATTRS, translate):
+                if abs(val) > tolerance:
+                    obj_issues.append(f"{attr} = {val:.4f}")
 
         if check_rotate:
-            for attr in ["rotateX", "rotateY", "rotateZ"]:
-                try:
-                    val = cmds.getAttr("{}.{}".format(obj, attr))
-                    if abs(val) > tolerance:
-                        obj_issues.append("{} = {:.4f}".format(attr, val))
-                except Exception:
-                    pass
+            for attr, val in zip(_ROTATE_ATTRS, rotate):
+                if abs(val) > tolerance:
+                    obj_issues.append(f"{attr} = {val:.4f}")
 
         if check_scale:
-            for attr in ["scaleX", "scaleY", "scaleZ"]:
-                try:
-                    val = cmds.getAttr("{}.{}".format(obj, attr))
-                    if abs(val - 1.0) > tolerance:
-                        obj_issues.append("{} = {:.4f}".format(attr, val))
-                except Exception:
-                    pass
+            for attr, val in zip(_SCALE_ATTRS, scale):
+                if abs(val - 1.0) > tolerance:
+                    obj_issues.append(f"{attr} = {val:.4f}")
 
         if obj_issues:
-            issues.append("  {} : {}".format(short, ", ".join(obj_issues)))
+            issues.append(f"  {short} : {', '.join(obj_issues)}")
         else:
             clean_count += 1
 
@@ -421,60 +524,65 @@ def create_controllers_for_joints(joints=None, ctrl_suffix="_ctrl",
                                   color_index=17):
     """Create NURBS circle controllers for joints with parent constraints."""
     if not joints:
+        # ls does the joint filtering for the whole selection in one call
         joints = cmds.ls(selection=True, type="joint", long=True) or []
-    if not joints:
-        # Maybe selected transforms that are actually joints?
-        sel = cmds.ls(selection=True, long=True) or []
-        joints = [s for s in sel if cmds.nodeType(s) == "joint"]
     if not joints:
         return {"success": False, "message": "没有指定骨骼，也没有选中任何骨骼。"}
 
     created = []
     errors = []
 
-    for jnt in joints:
-        if not cmds.objExists(jnt):
-            errors.append("{}: 不存在".format(jnt))
-            continue
+    # One undo chunk already wraps the tool (ActionExecutor); pausing the
+    # Evaluation Manager and redraws keeps each new constraint from
+    # triggering a graph rebuild
+    with _fast_scene():
+        for jnt in joints:
+            if not cmds.objExists(jnt):
+                errors.append(f"{jnt}: 不存在")
+                continue
 
-        short = jnt.rsplit("|", 1)[-1]
-        # Remove 'jnt' / 'Jnt' / 'JNT' / 'joint' suffix for clean naming
-        base_name = re.sub(r'(?i)_?(?:jnt|joint)$', '', short)
-        if not base_name:
-            base_name = short
+            short = jnt.rsplit("|", 1)[-1]
+            # Remove 'jnt' / 'Jnt' / 'JNT' / 'joint' suffix for clean naming
+            base_name = _JOINT_SUFFIX_RE.sub("", short)
+            if not base_name:
+                base_name = short
 
-        ctrl_name = base_name + ctrl_suffix
-        grp_name = base_name + grp_suffix
+            ctrl_name = base_name + ctrl_suffix
+            grp_name = base_name + grp_suffix
 
-        try:
-            # Create NURBS circle
-            ctrl = cmds.circle(
-                name=ctrl_name,
-                normal=[1, 0, 0],
-                radius=radius,
-                constructionHistory=False,
-            )[0]
-
-            # Set override color
-            shape = cmds.listRelatives(ctrl, shapes=True)[0]
-            cmds.setAttr("{}.overrideEnabled".format(shape), 1)
-            cmds.setAttr("{}.overrideColor".format(shape), color_index)
-
-            # Create offset group
-            grp = cmds.group(ctrl, name=grp_name)
-
-            # Match to joint transform
-            pos = cmds.xform(jnt, query=True, worldSpace=True, translation=True)
-            rot = cmds.xform(jnt, query=True, worldSpace=True, rotation=True)
-            cmds.xform(grp, worldSpace=True, translation=pos)
-            cmds.xform(grp, worldSpace=True, rotation=rot)
-
-            # Create parent constraint
-            cmds.parentConstraint(ctrl, jnt, maintainOffset=True)
-
-            created.append("{} → {}".format(short, ctrl_name))
-        except Exception as e:
-            errors.append("{}: {}".format(short, str(e)))
+            try:
+                # Create NURBS circle
+                ctrl = cmds.circle(
+                    name=ctrl_name,
+                    normal=[1, 0, 0],
+                    radius=radius,
+                    constructionHistory=False,
+                )[0]
+
+                # Set override color
+                shape = cmds.listRelatives(ctrl, shapes=True)[0]
+                cmds.setAttr(f"{shape}.overrideEnabled", 1)
+                cmds.setAttr(f"{shape}.overrideColor", color_index)
+
+                # Create offset group
+                grp = cmds.group(ctrl, name=grp_name)
+
+                # Match to joint transform: one world-matrix query, decomposed so
+                # only position and orientation (joint orient included) are
+                # applied - the joint's scale and shear stay off the group
+                matrix = om2.MTransformationMatrix(om2.MMatrix(
+                    cmds.xform(jnt, query=True, worldSpace=True, matrix=True)))
+                pos = matrix.translation(om2.MSpace.kWorld)
+                rot = [om2.MAngle.internalToUI(a) for a in matrix.rotation()]
+                cmds.xform(grp, worldSpace=True,
+                           translation=(pos.x, pos.y, pos.z), rotation=rot)
+
+                # Create parent constraint
+                cmds.parentConstraint(ctrl, jnt, maintainOffset=True)
+
+                created.append(f"{short} → {ctrl_name}")
+            except Exception as e:
+                errors.append(f"{short}: {e}")
 
     parts = []
     if created:
@@ -507,7 +615,10 @@ def create_controllers_for_joints(joints=None, ctrl_suffix="_ctrl",
             },
             "delete_history": {
                 "type": "boolean",
-                "description": "是否同时删除构造历史。默认 false。",
+                "description": (
+                    "是否同时删除构造历史。默认 false。"
+                    "删除节点时其构造历史会随之清理，此参数仅为兼容保留。"
+                ),
             },
         },
         "required": [],
@@ -523,19 +634,28 @@ def delete_objects(objects=None, delete_history=False):
     deleted = []
     errors = []
 
+    valid_objects = []
     for obj in objects:
-        if not cmds.objExists(obj):
-            errors.append("{}: 不存在".format(obj))
-            continue
+        if cmds.objExists(obj):
+            valid_objects.append(obj)
+        else:
+            errors.append(f"{obj}: 不存在")
 
-        short = obj.rsplit("|", 1)[-1]
+    # One delete for everything; a node's construction history goes with it,
+    # so delete_history needs no separate pass. Only if the batch fails is
+    # each object retried alone, to report which one is at fault.
+    if valid_objects:
         try:
-            if delete_history:
-                cmds.delete(obj, constructionHistory=True)
-            cmds.delete(obj)
-            deleted.append(short)
-        except Exception as e:
-            errors.append("{}: {}".format(short, str(e)))
+            cmds.delete(valid_objects)
+            deleted = [obj.rsplit("|", 1)[-1] for obj in valid_objects]
+        except Exception:
+            for obj in valid_objects:
+                short = obj.rsplit("|", 1)[-1]
+                try:
+                    cmds.delete(obj)
+                    deleted.append(short)
+                except Exception as e:
+                    errors.append(f"{short}: {e}")
 
     parts = []
     if deleted:
@@ -593,23 +713,39 @@ def freeze_transformations(objects=None, translate=True, rotate=True, scale=True
     frozen = []
     errors = []
 
+    valid_objects = []
     for obj in objects:
-        if not cmds.objExists(obj):
-            errors.append("{}: 不存在".format(obj))
-            continue
+        if cmds.objExists(obj):
+            valid_objects.append(obj)
+        else:
+            errors.append(f"{obj}: 不存在")
 
-        short = obj.rsplit("|", 1)[-1]
+    # Freeze everything in one makeIdentity; only if that fails is each
+    # object retried alone, to report which one is at fault
+    if valid_objects:
         try:
             cmds.makeIdentity(
-                obj, apply=True,
+                valid_objects, apply=True,
                 translate=translate,
                 rotate=rotate,
                 scale=scale,
                 normal=False,
             )
-            frozen.append(short)
-        except Exception as e:
-            errors.append("{}: {}".format(short, str(e)))
+            frozen = [obj.rsplit("|", 1)[-1] for obj in valid_objects]
+        except Exception:
+            for obj in valid_objects:
+                short = obj.rsplit("|", 1)[-1]
+                try:
+                    cmds.makeIdentity(
+                        obj, apply=True,
+                        translate=translate,
+                        rotate=rotate,
+                        scale=scale,
+                        normal=False,
+                    )
+                    frozen.append(short)
+                except Exception as e:
+                    errors.append(f"{short}: {e}")
 
     parts = []
     if frozen:
@@ -6,16 +6,16 @@ IMPORTANT: All functions in this module MUST be called from the MAIN THREAD
 because maya.cmds / playblast is not thread-safe.
 """
 
-import base64
-import os
-import tempfile
-
 import maya.cmds as cmds
 
 from . import config
 from .logger import log
 
 
+# modelPanel returned by the last get_active_viewport() call
+_CACHED_PANEL = None
+
+
 def get_active_viewport():
     """
     Get the currently active 3D viewport (modelPanel).
@@ -23,28 +23,80 @@ def get_active_viewport():
     Returns:
         str or None: Panel name (e.g. 'modelPanel4') or None if not found.
     """
+    global _CACHED_PANEL
+
     # Try the panel with focus first
     try:
         panel = cmds.getPanel(withFocus=True)
         if panel and cmds.getPanel(typeOf=panel) == "modelPanel":
+            _CACHED_PANEL = panel
             return panel
     except Exception:
         pass
 
+    # Focus is elsewhere (e.g. on the agent window): reuse the last viewport
+    # while it still exists instead of rescanning every model panel
+    try:
+        if _CACHED_PANEL and cmds.modelPanel(_CACHED_PANEL, query=True, exists=True):
+            return _CACHED_PANEL
+    except Exception:
+        pass
+
     # Fallback: find any visible modelPanel
     for panel in cmds.getPanel(type="modelPanel") or []:
         try:
             if cmds.modelPanel(panel, query=True, exists=True):
+                _CACHED_PANEL = panel
                 return panel
         except Exception:
             continue
 
+    _CACHED_PANEL = None
     return None
 
 
-def capture_viewport(width=None, height=None, panel=None):
+def _grab_view_buffer(panel, width, height, path, image_format):
+    """Save what a model panel currently shows, without a playblast.
+
+    Reads the panel's colour buffer into an MImage, scales it down to fit
+    width x height (a smaller buffer keeps its native size rather than
+    being upsampled) and writes it to `path`. Skipping playblast avoids a
+    second offscreen render of the scene.
+
+    Returns:
+        tuple or None: (width, height) written, or None when the buffer
+        cannot be read (e.g. the panel is hidden); callers then playblast.
     """
-    Capture the active Maya viewport as a PNG image and return base64 data.
+    try:
+        import maya.api.OpenMaya as om2
+        import maya.api.OpenMayaUI as omui
+
+        view = omui.M3dView.getM3dViewFromModelPanel(panel)
+        if not view.isVisible():
+            return None
+        view.refresh(False, True)
+        image = om2.MImage()
+        view.readColorBuffer(image, True)
+        buffer_width, buffer_height = image.getSize()
+        if buffer_width > width or buffer_height > height:
+            image.resize(width, height, True)
+        image.writeToFile(path, image_format)
+        return image.getSize()
+    except Exception as e:
+        log.debug("Viewport buffer read failed, using playblast: %s", e)
+        return None
+
+
+# playblast compression -> (file extension, MIME type)
+_IMAGE_FORMATS = {
+    "png": (".png", "image/png"),
+    "jpg": (".jpg", "image/jpeg"),
+}
+
+
+def capture_viewport(width=None, height=None, panel=None, image_format="png"):
+    """
+    Capture the active Maya viewport as an image and return its bytes.
 
     Uses cmds.playblast() for reliable viewport capture with all rendering
     features (textures, shadows, etc.) preserved.
@@ -53,20 +105,33 @@ def capture_viewport(width=None, height=None, panel=None):
         width: Image width in pixels. Default from config or 960.
         height: Image height in pixels. Default from config or 540.
         panel: Specific modelPanel to capture. Default: auto-detect.
+        image_format: "png" (lossless, best for line art such as wireframe)
+            or "jpg" (several times smaller for shaded views).
 
     Returns:
         dict with keys:
             - success (bool)
-            - image_base64 (str): base64-encoded PNG data (without data URI prefix)
+            - image_bytes (bytes): raw image data; see to_data_uri() for the
+              base64 form the vision API expects
+            - mime_type (str): MIME type of image_bytes
             - width (int)
             - height (int)
             - error (str): only present if success is False
     """
+    # Imported here rather than at module level: tempfile drags in random
+    # and shutil, which plugin start-up never needs
+    import os
+    import tempfile
+
     if width is None:
         width = int(config.get("VISION_WIDTH", "1280"))
     if height is None:
         height = int(config.get("VISION_HEIGHT", "720"))
 
+    if image_format not in _IMAGE_FORMATS:
+        image_format = "png"
+    ext, mime_type = _IMAGE_FORMATS[image_format]
+
     # Clamp resolution
     width = max(320, min(3840, width))
     height = max(240, min(2160, height))
@@ -77,36 +142,48 @@ def capture_viewport(width=None, height=None, panel=None):
         return {
             "success": False,
             "error": "No active 3D viewport found.",
-            "image_base64": "",
+            "image_bytes": b"",
+            "mime_type": mime_type,
             "width": 0,
             "height": 0,
         }
 
-    # Use a temporary file for the playblast output
-    tmp_dir = tempfile.gettempdir()
+    # Use a temporary file for the playblast output, in RAM-backed /dev/shm
+    # on Linux so repeated captures never touch the disk
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        tmp_dir = "/dev/shm"
+    else:
+        tmp_dir = tempfile.gettempdir()
     tmp_path = os.path.join(tmp_dir, "maya_ai_agent_viewport")
 
     try:
-        # playblast captures the viewport as an image
-        result_path = cmds.playblast(
-            frame=cmds.currentTime(query=True),
-            format="image",
-            compression="png",
-            quality=95,
-            widthHeight=[width, height],
-            viewer=False,
-            showOrnaments=True,
-            offScreen=True,
-            completeFilename=tmp_path + ".png",
-            editorPanelName=panel,
-            percent=100,
-        )
+        # Fast path: copy the panel's colour buffer as already drawn
+        size = _grab_view_buffer(panel, width, height, tmp_path + ext, image_format)
+        if size is not None:
+            result_path = tmp_path + ext
+            width, height = size
+        else:
+            # playblast captures the viewport as an image
+            result_path = cmds.playblast(
+                frame=cmds.currentTime(query=True),
+                format="image",
+                compression=image_format,
+                quality=85 if image_format == "jpg" else 95,
+                widthHeight=[width, height],
+                viewer=False,
+                showOrnaments=True,
+                offScreen=True,
+                completeFilename=tmp_path + ext,
+                editorPanelName=panel,
+                percent=100,
+            )
 
         if not result_path:
             return {
                 "success": False,
                 "error": "playblast returned no file path.",
-                "image_base64": "",
+                "image_bytes": b"",
+                "mime_type": mime_type,
                 "width": 0,
                 "height": 0,
             }
@@ -115,7 +192,7 @@ def capture_viewport(width=None, height=None, panel=None):
         actual_path = result_path
         if not os.path.isfile(actual_path):
             # Try common variations
-            for suffix in [".png", ".0.png"]:
+            for suffix in [ext, ".0" + ext]:
                 candidate = tmp_path + suffix
                 if os.path.isfile(candidate):
                     actual_path = candidate
@@ -125,23 +202,23 @@ def capture_viewport(width=None, height=None, panel=None):
             return {
                 "success": False,
                 "error": "Captured file not found: {}".format(actual_path),
-                "image_base64": "",
+                "image_bytes": b"",
+                "mime_type": mime_type,
                 "width": 0,
                 "height": 0,
             }
 
-        # Read and encode
+        # Read only; base64 encoding is left to whoever sends the image
         with open(actual_path, "rb") as f:
             image_data = f.read()
 
-        image_b64 = base64.b64encode(image_data).decode("ascii")
-
         log.info("Viewport captured: %dx%d, %.1f KB",
                  width, height, len(image_data) / 1024.0)
 
         return {
             "success": True,
-            "image_base64": image_b64,
+            "image_bytes": image_data,
+            "mime_type": mime_type,
             "width": width,
             "height": height,
         }
@@ -151,13 +228,14 @@ def capture_viewport(width=None, height=None, panel=None):
         return {
             "success": False,
             "error": str(e),
-            "image_base64": "",
+            "image_bytes": b"",
+            "mime_type": mime_type,
             "width": 0,
             "height": 0,
         }
     finally:
         # Cleanup temp files
-        for suffix in [".png", ".0.png"]:
+        for suffix in [ext, ".0" + ext]:
             path = tmp_path + suffix
             try:
                 if os.path.isfile(path):
@@ -166,6 +244,14 @@ def capture_viewport(width=None, height=None, panel=None):
                 pass
 
 
+def to_data_uri(image_bytes, mime_type="image/png"):
+    """Encode image bytes as a data URI for the vision API's image_url field."""
+    import base64
+
+    return "data:{};base64,{}".format(
+        mime_type, base64.b64encode(image_bytes).decode("ascii"))
+
+
 def capture_viewport_base64_uri(width=None, height=None):
     """
     Convenience wrapper: capture viewport and return a data URI string
@@ -176,5 +262,5 @@ def capture_viewport_base64_uri(width=None, height=None):
     """
     result = capture_viewport(width=width, height=height)
     if result["success"]:
-        return "data:image/png;base64," + result["image_base64"]
+        return to_data_uri(result["image_bytes"], result["mime_type"])
     return None